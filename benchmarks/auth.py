@@ -0,0 +1,58 @@
+"""
+How long does resolving auth.player and auth.admin take per request? Compares
+tokens looked up in a room that has seen many logins with signed ones
+(lonelyconnect_token_secret), and the linear scan that User.get_token() used
+to do for every buzzer and admin page with the index it uses now:
+
+    python benchmarks/auth.py --logins 10000
+"""
+
+import sys
+import time
+import timeit
+import argparse
+
+sys.path.insert(0, ".")
+
+from lonelyconnect import auth, credentials, rooms  # noqa: E402
+
+
+def per_call(function, number):
+    """Microseconds per call, best of 5."""
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=10000)
+    parser.add_argument("--number", type=int, default=100000)
+    args = parser.parse_args()
+
+    room = rooms.Room("bench")
+    # many devices logging in again and again, as over a long event
+    room.tokens.keep = args.logins
+    now = time.time()
+    for i in range(args.logins):
+        room.tokens.add(f"token{i}", ("right", "admin")[i % 2], now)
+    # last, the worst case for a scan from the oldest
+    room.tokens.add("token", "left", now)
+    stored = {name: room.tokens.newest(name) for name in ("left", "admin")}
+    credentials.SECRET = "benchmark"
+    signed = {
+        name: credentials.sign(name, room.id, now + credentials.TOKEN_TTL)
+        for name in ("left", "admin")
+    }
+    plain = dict(room.tokens)
+
+    for dependency, name in ((auth.player, "left"), (auth.admin, "admin")):
+        for kind, token in (("stored", stored[name]), ("signed", signed[name])):
+            cost = per_call(lambda: dependency(token, room), args.number)
+            print(f"auth.{dependency.__name__}, {kind} token: {cost:.2f} µs")
+    user = room.users["left"]
+    scan = per_call(lambda: user.get_token(plain), max(1, args.number // 1000))
+    index = per_call(lambda: user.get_token(room.tokens), args.number)
+    print(f"User.get_token: scan {scan:.2f} µs, index {index:.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+How long do the game's hot paths take? Times, for generated packs (always
+the same for the same seed) of several sizes: loading a pack, playing a whole
+game as an admin would (with the teams buzzing now and then), stage(),
+actions() and secrets() per state of such a game, obfuscating the phrases of
+missing vowels, and snapshotting and restoring a room mid-game:
+
+    python benchmarks/game.py --sizes 10 100 1000
+
+Results can be kept and compared, failing (exit code 1) if anything got
+slower by more than the threshold:
+
+    python benchmarks/game.py --save before.json
+    python benchmarks/game.py --compare before.json --threshold 0.25
+
+or measured for another revision (in a temporary git worktree) and the
+working tree, taking turns, and compared right away:
+
+    python benchmarks/game.py --revision HEAD~5 --rounds 3
+
+Timings on busy or virtual machines easily vary by 20%, hence the default
+threshold of 25%.
+"""
+
+import os
+import sys
+import json
+import random
+import timeit
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, ".")
+
+from lonelyconnect import game, packs, rooms, snapshots  # noqa: E402
+
+WORDS = "alpha bravo charlie delta echo foxtrot golf hotel india juliett".split()
+
+
+def make_pack(size, seed):
+    rng = random.Random(seed)
+
+    def words(n):
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    def questions():
+        return [
+            {
+                "answer": words(3),
+                "explanation": words(8),
+                "steps": [
+                    {"label": words(2), "explanation": words(4)} for _ in range(4)
+                ],
+            }
+            for _ in range(size)
+        ]
+
+    return {
+        "parts": [
+            {"type": "connections", "questions": questions()},
+            {"type": "sequences", "questions": questions()},
+            {
+                "type": "missing vowels",
+                "groups": [
+                    {"name": words(2), "phrases": [words(3) for _ in range(4)]}
+                    for _ in range(size)
+                ],
+            },
+        ]
+    }
+
+
+def loaded(pack, seed):
+    g = game.Game()
+    g.load_pack(pack, seed)
+    return g
+
+
+def play(g, each_state=None, steps=None):
+    """
+    Play the game to the end (or for that many steps) like an admin would:
+    award whoever buzzed, otherwise go on. A team buzzes in every third state
+    it can. Return how many states there were.
+    """
+    states = 0
+    while states != steps:
+        states += 1
+        if each_state:
+            each_state(g)
+        if g.buzz_state.startswith("active") and not states % 3:
+            g.buzz(g.buzz_state.partition("-")[2] or ("left", "right")[states % 2])
+        keys = [key for key, _ in g.actions()]
+        if not keys:
+            return states
+        if "award_primary" in keys:
+            g.action("award_primary")
+            # missing vowels leave that to the admin's buzz buttons
+            if g.buzz_state in ("left", "right"):
+                g.buzz_state = "inactive"
+        else:
+            g.action("next" if "next" in keys else keys[0])
+    return states
+
+
+def best(function, repeat):
+    """
+    Milliseconds per call of function, best of repeat runs of as many calls
+    as take 0.2s: anything shorter is too noisy to tell regressions from.
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1000
+
+
+def measure(size, seed, repeat):
+    pack = packs.PACKS.add(make_pack(size, seed))
+    packs.PACKS.get(pack).decode()  # once, as any process does at some point
+    results = {}
+    results[f"load/{size}"] = best(lambda: loaded(pack, seed), repeat)
+    results[f"playthrough/{size}"] = best(lambda: play(loaded(pack, seed)), repeat)
+
+    # states all through a game, to call stage() etc. on
+    states = []
+    play(loaded(pack, seed), lambda g: states.append(g.dump_state()))
+    games = []
+    for state in states[:: max(1, len(states) // 200)]:
+        g = game.Game()
+        g.restore_state(json.loads(json.dumps(state)))
+        games.append(g)
+    for method in ("stage", "actions", "secrets"):
+        results[f"{method}/{size}"] = best(
+            lambda: [getattr(g, method)() for g in games], repeat
+        ) / len(games)
+
+    phrases = [
+        phrase
+        for group in make_pack(size, seed)["parts"][2]["groups"]
+        for phrase in group["phrases"]
+    ]
+    rng = random.Random(seed)
+    results[f"obfuscate/{size}"] = best(
+        lambda: [game.obfuscate(phrase, rng) for phrase in phrases], repeat
+    ) / len(phrases)
+
+    room = rooms.Room("bench")
+    room.execute("load", pack, seed)
+    play(room.game, steps=len(states) // 2)
+    results[f"snapshot/{size}"] = best(lambda: snapshots.dump(room), repeat)
+    snapshot = json.loads(json.dumps(snapshots.dump(room)))
+    results[f"restore/{size}"] = best(
+        lambda: snapshots.restore(rooms.Room("bench"), snapshot), repeat
+    )
+    return results
+
+
+def run(tree, argv):
+    """The results of this benchmark for the code in tree, in a fresh process."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "results.json")
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *argv, "--save", output],
+            cwd=tree,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        with open(output) as f:
+            return json.load(f)
+
+
+def against_revision(revision, argv, rounds):
+    """
+    Results for revision (checked out in a temporary git worktree) and for the
+    working tree, taking turns so that both see the same noise, and keeping
+    the best of the rounds for each.
+    """
+    before, after = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = os.path.join(tmp, "tree")
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", worktree, revision],
+            check=True,
+            capture_output=True,
+        )
+        try:
+            for _ in range(rounds):
+                for results, tree in ((before, worktree), (after, ".")):
+                    for name, time in run(tree, argv).items():
+                        results[name] = min(time, results.get(name, time))
+        finally:
+            subprocess.run(
+                ["git", "worktree", "remove", "--force", worktree],
+                check=True,
+                capture_output=True,
+            )
+    return before, after
+
+
+def compare(before, after, threshold):
+    """Print both; return whether nothing got slower by more than threshold."""
+    ok = True
+    print(f"{'':20} {'before ms':>12} {'after ms':>12} {'change':>8}")
+    for name, time in after.items():
+        if name not in before:
+            print(f"{name:20} {'':>12} {time:12.4f}")
+            continue
+        change = time / before[name] - 1
+        regressed = change > threshold
+        ok = ok and not regressed
+        print(
+            f"{name:20} {before[name]:12.4f} {time:12.4f} {change:+8.0%}"
+            + ("  SLOWER" if regressed else "")
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare with results from --save")
+    parser.add_argument("--revision", help="compare with this git revision")
+    parser.add_argument(
+        "--rounds", type=int, default=3, help="turns each tree takes with --revision"
+    )
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    if args.revision:
+        argv = ["--sizes", *map(str, args.sizes), "--seed", str(args.seed)]
+        argv += ["--repeat", str(args.repeat)]
+        before, results = against_revision(args.revision, argv, args.rounds)
+    else:
+        before = None
+        if args.compare:
+            with open(args.compare) as f:
+                before = json.load(f)
+        results = {}
+        for size in args.sizes:
+            try:
+                results.update(measure(size, args.seed, args.repeat))
+            except Exception as e:  # other revisions may lack something
+                print(f"size {size}: {type(e).__name__}: {e}", file=sys.stderr)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=1)
+    if before is None:
+        for name, time in results.items():
+            print(f"{name:20} {time:12.4f} ms")
+    elif not compare(before, results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+How long does it take to put a game together from a big question library?
+Fills a temporary library with the given number of items, then assembles
+games from it:
+
+    python benchmarks/library.py --items 500000 --games 20
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, ".")
+
+from lonelyconnect import library  # noqa: E402
+
+
+def make_bank(items):
+    def question(i):
+        return {
+            "answer": f"Answer {i}",
+            "explanation": f"Explanation of answer {i}",
+            "steps": [{"label": f"Clue {j} of {i}"} for j in range(4)],
+        }
+
+    third = items // 3
+    return {
+        "parts": [
+            {"type": "connections", "questions": [question(i) for i in range(third)]},
+            {"type": "sequences", "questions": [question(-i) for i in range(third)]},
+            {
+                "type": "missing vowels",
+                "groups": [
+                    {
+                        "name": f"Group {i}",
+                        "phrases": [f"phrase {i} {j}" for j in "abcd"],
+                    }
+                    for i in range(items - 2 * third)
+                ],
+            },
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=500000)
+    parser.add_argument("--games", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lib = library.Library(f"{tmp}/library.db")
+        start = time.perf_counter()
+        lib.add_game(make_bank(args.items))
+        print(f"adding {args.items} items: {time.perf_counter() - start:.1f} s")
+
+        timings = []
+        for _ in range(args.games):
+            start = time.perf_counter()
+            lib.assemble()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        print(
+            f"assembling a game: median {timings[len(timings) // 2]:.2f} ms,"
+            f" max {timings[-1]:.2f} ms"
+        )
+        start = time.perf_counter()
+        found = lib.search('"clue 3 of 12345"')
+        print(
+            f"search: {len(found)} results in {(time.perf_counter() - start) * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
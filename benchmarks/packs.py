@@ -0,0 +1,61 @@
+"""
+How long does it take to load a game from a big question bank, and how much
+memory does it need? Compiles a pack with many questions into a temporary
+directory, then loads a game from it as a restarted server would:
+
+    python benchmarks/packs.py --questions 100000
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, ".")
+
+from lonelyconnect import game, packs  # noqa: E402
+
+sys.path.insert(0, "benchmarks")
+
+from snapshots import make_pack  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--questions", type=int, default=100000)
+    args = parser.parse_args()
+
+    game_data = make_pack(args.questions)
+    source_size = len(json.dumps(game_data))
+    with tempfile.TemporaryDirectory() as tmp:
+        store = packs.PackStore()
+        store.keep_in(tmp)
+        start = time.perf_counter()
+        digest = store.add(game_data)
+        compile_ms = (time.perf_counter() - start) * 1000
+        pack_size = len(store.get(digest).buffer)
+        del game_data
+
+        # a fresh process only finds the file
+        packs.PACKS = packs.PackStore()
+        packs.PACKS.keep_in(tmp)
+        tracemalloc.start()
+        start = time.perf_counter()
+        g = game.Game()
+        g.load_pack(digest, 1)
+        g.action("next")
+        g.action("next")
+        load_ms = (time.perf_counter() - start) * 1000
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"{args.questions} questions, {source_size} bytes as JSON")
+    print(f"compiled: {pack_size} bytes in {compile_ms:.0f} ms")
+    print(f"loading a game and its first question: {load_ms:.2f} ms")
+    print(f"peak memory allocated while loading: {peak} bytes")
+
+
+if __name__ == "__main__":
+    main()
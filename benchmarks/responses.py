@@ -0,0 +1,88 @@
+"""
+How many bytes does a screen polling the stage receive per poll, and how long
+does turning the state into JSON take? Compares uncompressed responses with
+gzip and brotli (if installed), and FastAPI's JSON encoding with orjson (if
+installed) and its pure-Python fallback:
+
+    python benchmarks/responses.py --number 10000
+
+Run it from the repository root (where templates/ and static/ are).
+"""
+
+import os
+import sys
+import timeit
+import argparse
+
+sys.path.insert(0, ".")
+os.environ["lonelyconnect_no_swap"] = "1"
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+
+from lonelyconnect import app, rooms, responses  # noqa: E402
+
+
+def make_pack():
+    return {
+        "parts": [
+            {
+                "type": "connections",
+                "questions": [
+                    {
+                        "answer": f"Answer {i}",
+                        "explanation": f"Explanation of answer {i}",
+                        "steps": [
+                            {"label": f"Clue {j} of {i}", "explanation": "Why"}
+                            for j in range(4)
+                        ],
+                    }
+                    for i in range(6)
+                ],
+            }
+        ]
+    }
+
+
+def per_call(function, number):
+    """Microseconds per call, best of 5."""
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=10000)
+    args = parser.parse_args()
+
+    room = rooms.DEFAULT
+    room.execute("load", make_pack(), 1)
+    for key in ("next", "next", "start_left", "next", "next"):
+        room.execute("action", key)
+    client = TestClient(app)
+
+    encodings = ["identity"] + [encoding for encoding, _ in responses.ENCODINGS]
+    for path in ("/stage", "/ui/stage?poll=true"):
+        sizes = []
+        for encoding in encodings:
+            r = client.get(path, headers={"Accept-Encoding": encoding}, stream=True)
+            sizes.append(f"{encoding} {len(r.raw.read(decode_content=False))}")
+        print(f"{path}: bytes per poll: {', '.join(sizes)}")
+
+    view = room.view
+    for name in ("stage", "actions", "secrets"):
+        content = getattr(view, name)
+        before = per_call(lambda: JSONResponse(jsonable_encoder(content)), args.number)
+        fast = per_call(lambda: responses.FastJSONResponse(content), args.number)
+        orjson, responses.orjson = responses.orjson, None
+        fallback = per_call(lambda: responses.FastJSONResponse(content), args.number)
+        responses.orjson = orjson
+        print(
+            f"{name}: JSONResponse(jsonable_encoder()) {before:.1f} µs, "
+            f"FastJSONResponse {fast:.1f} µs "
+            f"({'orjson' if orjson else 'json'}), without orjson {fallback:.1f} µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
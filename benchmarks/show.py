@@ -0,0 +1,338 @@
+"""
+How many spectators can one process serve during a show? Starts a server and
+plays tutorial.yml on it, over and over: the admin presses the first action
+offered every few seconds, both teams poll their buzzers and buzz now and
+then, and N spectators poll /ui/stage like stage screens without
+Server-Sent Events do:
+
+    python benchmarks/show.py --spectators 100 200 400 --duration 20
+
+Reports the p50/p99 latency per route, requests per second and the server's
+CPU time per spectator. With --pack-mb, the admin also uploads a generated
+game file of that many megabytes now and then, to see whether buzzing and
+the stage keep up meanwhile:
+
+    python benchmarks/show.py --spectators 100 --pack-mb 50 --duration 60
+
+Needs nothing but the repository (run it from its root, where templates/ and
+static/ are), and exits with 1 if any request failed, so it can run in CI.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import itertools
+import subprocess
+import collections
+import urllib.parse
+
+ADMIN_CODE = "BENCH1"
+WORDS = "alpha bravo charlie delta echo foxtrot golf hotel india juliett".split()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def big_pack(megabytes, rng):
+    """A valid game file (JSON is YAML too) of about that many megabytes."""
+
+    def words(n):
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    def question():
+        return {
+            "answer": words(3),
+            "explanation": words(8),
+            "steps": [{"label": words(2), "explanation": words(4)} for _ in range(4)],
+        }
+
+    # each question takes about 400 bytes
+    count = max(1, int(megabytes * 1_000_000 / 400 / 2))
+    return json.dumps(
+        {
+            "parts": [
+                {"type": kind, "questions": [question() for _ in range(count)]}
+                for kind in ("connections", "sequences")
+            ]
+        }
+    ).encode()
+
+
+def cpu_seconds(pid):
+    """User and system time of the process so far (Linux only), or None."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rpartition(")")[2].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class Connection:
+    """A keep-alive HTTP/1.1 connection, just enough for our own server."""
+
+    def __init__(self, port):
+        self.port = port
+        self.streams = None
+
+    async def request(self, method, path, headers=(), body=b""):
+        if not self.streams:
+            self.streams = await asyncio.open_connection("127.0.0.1", self.port)
+        reader, writer = self.streams
+        head = [
+            f"{method} {path} HTTP/1.1",
+            "Host: 127.0.0.1",
+            f"Content-Length: {len(body)}",
+            *(f"{name}: {value}" for name, value in dict(headers).items()),
+        ]
+        writer.write("\r\n".join(head).encode() + b"\r\n\r\n" + body)
+        try:
+            status = int((await reader.readuntil(b"\r\n")).split()[1])
+            response_headers = {}
+            while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+                name, _, value = line.decode().partition(":")
+                response_headers[name.strip().lower()] = value.strip()
+            length = int(response_headers.get("content-length", 0))
+            return status, response_headers, await reader.readexactly(length)
+        except (OSError, asyncio.IncompleteReadError):
+            self.streams = None
+            raise
+
+
+class Show:
+    def __init__(self, port, duration):
+        self.port = port
+        self.deadline = time.monotonic() + duration
+        self.latencies = collections.defaultdict(list)
+        self.failures = collections.Counter()
+
+    @property
+    def running(self):
+        return time.monotonic() < self.deadline
+
+    async def request(self, connection, route, method, path, expected=(), **kw):
+        start = time.perf_counter()
+        try:
+            status, headers, body = await connection.request(method, path, **kw)
+        except (OSError, asyncio.IncompleteReadError):
+            self.failures[f"{route} (connection)"] += 1
+            return None, {}, b""
+        self.latencies[route].append((time.perf_counter() - start) * 1000)
+        if not (200 <= status < 300 or status == 304 or status in expected):
+            self.failures[f"{route} ({status})"] += 1
+        return status, headers, body
+
+    async def login(self, connection, code):
+        form = urllib.parse.urlencode(
+            {"grant_type": "password", "username": "nobody", "password": code}
+        ).encode()
+        _, _, body = await self.request(
+            connection,
+            "/login",
+            "POST",
+            "/login",
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            body=form,
+        )
+        return {"Authorization": f"Bearer {json.loads(body)['access_token']}"}
+
+    async def load(self, connection, auth, pack, route="/load"):
+        boundary = "lonelyconnect-show"
+        body = (
+            (
+                f"--{boundary}\r\n"
+                'Content-Disposition: form-data; name="file"; filename="show.yml"\r\n'
+                "\r\n"
+            ).encode()
+            + pack
+            + f"\r\n--{boundary}--\r\n".encode()
+        )
+        await self.request(
+            connection,
+            route,
+            "POST",
+            "/load",
+            headers={
+                **auth,
+                "Content-Type": f"multipart/form-data; boundary={boundary}",
+            },
+            body=body,
+        )
+
+    async def admin(self, pack, pace, teams, big):
+        connection = Connection(self.port)
+        auth = await self.login(connection, ADMIN_CODE)
+        for team in teams:
+            _, _, body = await self.request(
+                connection, "/pair", "POST", f"/pair/{team}", headers=auth
+            )
+            teams[team].set_result(json.loads(body))
+        await self.load(connection, auth, pack)
+        uploads = asyncio.create_task(self.upload(auth, big, pace))
+        while self.running:
+            await asyncio.sleep(pace)
+            _, _, body = await self.request(
+                connection, "/actions", "GET", "/actions", headers=auth
+            )
+            actions = json.loads(body or "[]")
+            if not actions:
+                # the show is over, on with the next one
+                await self.load(connection, auth, pack)
+                continue
+            key = actions[0][0]
+            await self.request(
+                connection, "/action/{key}", "POST", f"/action/{key}", headers=auth
+            )
+        await uploads
+
+    async def upload(self, auth, big, pace):
+        """Load the big game file over and over, changed so it's parsed anew."""
+        connection = Connection(self.port)
+        for i in itertools.count():
+            await asyncio.sleep(pace)
+            if not big or not self.running:
+                break
+            pack = big + f"\n# upload {i}\n".encode()
+            await self.load(connection, auth, pack, route="/load (big)")
+
+    async def team(self, code, rng):
+        connection = Connection(self.port)
+        auth = await self.login(connection, await code)
+        while self.running:
+            await asyncio.sleep(1)
+            await self.request(
+                connection, "/ui/buzzer", "GET", "/ui/buzzer", headers=auth
+            )
+            if rng.random() < 0.2:
+                await self.request(
+                    connection, "/buzz", "POST", "/buzz", expected=(409,), headers=auth
+                )
+
+    async def spectator(self, rng):
+        connection = Connection(self.port)
+        # not all screens at once
+        await asyncio.sleep(rng.random())
+        etag = None
+        while self.running:
+            headers = {"Accept-Encoding": "gzip"}
+            if etag:
+                headers["If-None-Match"] = etag
+            _, response_headers, _ = await self.request(
+                connection,
+                "/ui/stage",
+                "GET",
+                "/ui/stage?poll=true",
+                headers=headers,
+            )
+            etag = response_headers.get("etag", etag)
+            await asyncio.sleep(1)
+
+
+async def play(port, spectators, duration, pace, seed, pack_mb):
+    with open("tutorial.yml", "rb") as f:
+        pack = f.read()
+    rng = random.Random(seed)
+    show = Show(port, duration)
+    loop = asyncio.get_running_loop()
+    teams = {"left": loop.create_future(), "right": loop.create_future()}
+    big = pack_mb and big_pack(pack_mb, random.Random(seed))
+    await asyncio.gather(
+        show.admin(pack, pace, teams, big),
+        *(show.team(code, random.Random(rng.random())) for code in teams.values()),
+        *(show.spectator(random.Random(rng.random())) for _ in range(spectators)),
+    )
+    return show
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(spectators, duration, pace, seed, pack_mb):
+    port = free_port()
+    env = {
+        **os.environ,
+        "lonelyconnect_no_swap": "1",
+        "lonelyconnect_admin_code": ADMIN_CODE,
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "lonelyconnect:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    try:
+        for _ in range(200):
+            try:
+                socket.create_connection(("127.0.0.1", port)).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError("server didn't come up")
+        cpu_before = cpu_seconds(server.pid)
+        show = asyncio.run(play(port, spectators, duration, pace, seed, pack_mb))
+        cpu_after = cpu_seconds(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\n{spectators} spectators, {duration:.0f}s:")
+    print("    route              requests  p50 ms  p99 ms")
+    for route, latencies in sorted(show.latencies.items()):
+        print(
+            f"    {route:17} {len(latencies):9}"
+            f" {percentile(latencies, 0.5):7.2f} {percentile(latencies, 0.99):7.2f}"
+        )
+    total = sum(len(latencies) for latencies in show.latencies.values())
+    print(f"    {total / duration:.0f} requests/s")
+    if cpu_before is not None:
+        cpu = cpu_after - cpu_before
+        print(
+            f"    server CPU: {cpu / duration:.0%} of a core,"
+            f" {cpu / duration / spectators * 1000:.2f} ms/s per spectator"
+        )
+    for failure, count in sorted(show.failures.items()):
+        print(f"    FAILED {failure}: {count}")
+    return not show.failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--spectators", type=int, nargs="+", default=[100])
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument(
+        "--pace", type=float, default=2, help="seconds between admin actions"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--pack-mb", type=float, help="also upload game files this big, over and over"
+    )
+    args = parser.parse_args()
+    ok = all(
+        [
+            measure(spectators, args.duration, args.pace, args.seed, args.pack_mb)
+            for spectators in args.spectators
+        ]
+    )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
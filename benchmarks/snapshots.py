@@ -0,0 +1,80 @@
+"""
+How long do snapshotting and restoring a room take, and how big are the
+snapshots? Compares the JSON snapshots of snapshots.py with pickling the whole
+game, as swap.bin used to be, for a pack with many questions:
+
+    python benchmarks/snapshots.py --questions 10000
+"""
+
+import sys
+import json
+import time
+import pickle
+import argparse
+
+sys.path.insert(0, ".")
+
+from lonelyconnect import rooms, snapshots  # noqa: E402
+
+
+def make_pack(questions):
+    return {
+        "parts": [
+            {
+                "type": kind,
+                "questions": [
+                    {
+                        "answer": f"Answer {i}",
+                        "explanation": f"Explanation of answer {i}",
+                        "steps": [
+                            {"label": f"Clue {j} of {i}", "explanation": "Why"}
+                            for j in range(4)
+                        ],
+                    }
+                    for i in range(questions // 2)
+                ],
+            }
+            for kind in ("connections", "sequences")
+        ]
+    }
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--questions", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    room = rooms.Room("bench")
+    room.execute("load", make_pack(args.questions), 1)
+    for key in ("next", "next", "start_left", "next"):
+        room.execute("action", key)
+
+    dump_ms, data = timed(
+        lambda: json.dumps(snapshots.dump(room), separators=(",", ":")).encode(),
+        args.repeat,
+    )
+    restore_ms, _ = timed(
+        lambda: snapshots.restore(rooms.Room("bench"), json.loads(data)),
+        args.repeat,
+    )
+    pickle_ms, pickled = timed(lambda: pickle.dumps(room.state), args.repeat)
+    unpickle_ms, _ = timed(lambda: pickle.loads(pickled), args.repeat)
+
+    print(f"{args.questions} questions")
+    print(f"{'':10} {'size':>10} {'dump ms':>10} {'restore ms':>10}")
+    print(f"{'snapshot':10} {len(data):>10} {dump_ms:>10.2f} {restore_ms:>10.2f}")
+    print(f"{'pickle':10} {len(pickled):>10} {pickle_ms:>10.2f} {unpickle_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+How many stage requests per second can N workers answer?
+
+Starts an increasing number of lonelyconnect processes sharing an SQLite
+backend (as they would behind a reverse proxy), and lets several client
+processes poll /ui/stage on them as fast as they can:
+
+    python benchmarks/spectators.py --workers 1 2 4 --clients 8 --duration 5
+
+Run it from the repository root (where templates/ and static/ are). The
+workers run in a temporary directory, so whatever they store (packs, swap
+files, the database) is gone afterwards.
+
+More workers only help with CPUs to spare for them. On a single CPU, where
+the workers take turns with each other and with the clients, they are
+slower instead (8 clients, 5 seconds each):
+
+    workers  requests/s  speedup
+          1        1240    1.00x
+          2        1030    0.83x
+          4         747    0.60x
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import subprocess
+import http.client
+import multiprocessing
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(port, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/stage")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server didn't come up")
+
+
+def spectate(args):
+    port, duration = args
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    deadline = time.monotonic() + duration
+    requests = 0
+    while time.monotonic() < deadline:
+        conn.request("GET", "/ui/stage?poll=true")
+        conn.getresponse().read()
+        requests += 1
+    return requests
+
+
+def measure(workers, clients, duration):
+    ports = [free_port() for _ in range(workers)]
+    root = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("templates", "static", "assets"):
+            if os.path.exists(name):
+                os.symlink(os.path.join(root, name), os.path.join(tmp, name))
+        env = {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(
+                filter(None, [root, os.environ.get("PYTHONPATH")])
+            ),
+            "lonelyconnect_backend": f"sqlite:{tmp}/rooms.db",
+            "lonelyconnect_no_swap": "1",
+            "lonelyconnect_admin_code": "BENCH1",
+        }
+        servers = [
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "uvicorn",
+                    "lonelyconnect:app",
+                    "--port",
+                    str(port),
+                    "--log-level",
+                    "warning",
+                ],
+                env=env,
+                cwd=tmp,
+            )
+            for port in ports
+        ]
+        try:
+            for port in ports:
+                wait_until_up(port)
+            with multiprocessing.Pool(clients) as pool:
+                counts = pool.map(
+                    spectate, [(ports[i % workers], duration) for i in range(clients)]
+                )
+        finally:
+            for server in servers:
+                server.terminate()
+                server.wait()
+    return sum(counts) / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5)
+    args = parser.parse_args()
+    baseline = None
+    # workers and clients compete for the same CPUs: with fewer of them
+    # than workers + clients, more workers can't be faster
+    print(f"{os.cpu_count()} CPUs, {args.clients} clients")
+    print("workers  requests/s  speedup")
+    for workers in args.workers:
+        rate = measure(workers, args.clients, args.duration)
+        baseline = baseline or rate
+        print(f"{workers:7}  {rate:10.0f}  {rate / baseline:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
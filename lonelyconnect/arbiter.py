@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from collections import deque
+
+from . import stats
+
+log = logging.getLogger(__name__)
+
+MAX_WINDOW = 0.1  # never hold back a buzz for longer than this many seconds
+
+
+class ClockSync:
+    """
+    NTP-style estimate of how a buzzer's clock relates to ours. All times are
+    in seconds; the client clock can have any epoch.
+    """
+
+    def __init__(self, size=8):
+        self.samples = deque(maxlen=size)
+
+    def sample(self, sent, client_time, received):
+        """
+        We sent a ping at `sent`, the client answered with its own time
+        `client_time`, and we got that answer at `received`.
+        """
+        rtt = received - sent
+        offset = client_time - (sent + rtt / 2)
+        self.samples.append((rtt, offset))
+        log.info("clock sample: offset %.1fms, rtt %.1fms", offset * 1000, rtt * 1000)
+
+    @property
+    def best(self):
+        # the sample with the shortest round trip is the least ambiguous one
+        return min(self.samples, default=None)
+
+    @property
+    def rtt(self):
+        return self.best and self.best[0]
+
+    def to_server_time(self, client_time, received):
+        """When something that happened at `client_time` happened for us."""
+        if not self.samples:
+            return received
+        rtt, offset = self.best
+        # it can't have happened after we got it, nor before it was sent
+        return max(received - rtt, min(received, client_time - offset))
+
+
+class Arbiter:
+    """
+    Collect buzzes for a short window after the first one arrives, then hand
+    them to `decide` ordered by when they were pressed instead of when they
+    arrived. The window is as long as the slowest known buzzer connection.
+
+    There is one per room in each process, and each only sees the buzzes of
+    the buzzers connected to that process. With several workers, buzzes
+    arriving at different ones are still decided one after the other by the
+    backend, but in the order they arrived there; so the buzzers of a room
+    have to be routed to the same worker for their presses to count.
+    """
+
+    def __init__(self, decide):
+        self.decide = decide
+        self.clocks = {}
+        self.pending = []
+        self.deciding = None  # the task handing the last batch to `decide`
+
+    @property
+    def window(self):
+        rtts = [clock.rtt for clock in self.clocks.values() if clock.samples]
+        return min(MAX_WINDOW, max(rtts, default=0))
+
+    async def submit(self, who, pressed_at):
+        """Return what `decide` returned for this buzz, or raise what it raised."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((pressed_at, who, future))
+        if len(self.pending) == 1:
+            # not up to the first submitter, who may be gone before it closes
+            window = self.window
+            if window:
+                loop.call_later(window, self._close)
+            else:
+                loop.call_soon(self._close)  # no clock to wait for
+        return await future
+
+    def _close(self):
+        batch = sorted(self.pending, key=lambda buzz: buzz[0])
+        self.pending = []
+        if len(batch) > 1:
+            margin = (batch[1][0] - batch[0][0]) * 1000
+            stats.BUZZ_MARGIN.add(margin)
+            log.info(
+                "%s won the buzz by %.1fms over %s",
+                batch[0][1],
+                margin,
+                batch[1][1],
+            )
+        self.deciding = asyncio.get_running_loop().create_task(self._decide(batch))
+
+    async def _decide(self, batch):
+        try:
+            await self.decide(batch)
+        except Exception as e:
+            for _pressed_at, _who, future in batch:
+                if not future.done():
+                    future.set_exception(e)
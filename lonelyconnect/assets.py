@@ -0,0 +1,111 @@
+"""
+The files in static/, served from the venue's own server (it may have no
+internet), compressed ahead of time and cached by browsers for good.
+"""
+
+import os
+import gzip
+import json
+import stat
+import hashlib
+
+from starlette.datastructures import Headers
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is good enough
+    brotli = None
+
+# preferred first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _write(path, data):
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+
+def build(source, target):
+    """
+    Copy the files in source to target under names with a hash of their
+    content, each with compressed copies next to it where that helps, and
+    return the manifest of which name became which.
+    """
+    os.makedirs(target, exist_ok=True)
+    manifest = {}
+    for name in sorted(os.listdir(source)):
+        path = os.path.join(source, name)
+        if not os.path.isfile(path):
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        stem, extension = os.path.splitext(name)
+        hashed = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{extension}"
+        _write(os.path.join(target, hashed), data)
+        compressed = {".gz": gzip.compress(data, 9, mtime=0)}
+        if brotli:
+            compressed[".br"] = brotli.compress(data, quality=11)
+        for suffix, packed in compressed.items():
+            # images and the like are compressed already
+            if len(packed) < len(data):
+                _write(os.path.join(target, hashed + suffix), packed)
+        manifest[name] = hashed
+    _write(os.path.join(target, "manifest.json"), json.dumps(manifest).encode())
+    return manifest
+
+
+class Assets(StaticFiles):
+    """
+    Serves the files of directory, and what build() made of them in built if
+    it was run: those are served compressed to whoever accepts it, and with
+    their hashed names never change, so browsers needn't ask again.
+    """
+
+    def __init__(self, directory, built):
+        super().__init__(directory=directory)
+        try:
+            with open(os.path.join(built, "manifest.json")) as f:
+                self.manifest = json.load(f)
+        except FileNotFoundError:
+            self.manifest = {}
+        else:
+            self.all_directories = [built, *self.all_directories]
+        self.immutable = set(self.manifest.values())
+
+    def url(self, name):
+        """Where the file of that name in static/ is served."""
+        return f"/static/{self.manifest.get(name, name)}"
+
+    async def get_response(self, path, scope):
+        response = None
+        if scope["method"] in ("GET", "HEAD"):
+            accepted = {
+                encoding.split(";")[0].strip()
+                for encoding in Headers(scope=scope)
+                .get("accept-encoding", "")
+                .split(",")
+            }
+            for encoding, suffix in ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                full_path, stat_result = await self.lookup_path(path + suffix)
+                if stat_result and stat.S_ISREG(stat_result.st_mode):
+                    # typed by the name without the suffix, e.g. as text/css
+                    response = self.file_response(full_path, stat_result, scope)
+                    response.headers["Content-Encoding"] = encoding
+                    break
+        if response is None:
+            response = await super().get_response(path, scope)
+        response.headers["Vary"] = "Accept-Encoding"
+        if os.path.basename(path) in self.immutable:
+            response.headers["Cache-Control"] = IMMUTABLE
+        else:
+            response.headers.setdefault("Cache-Control", "no-cache")
+        return response
+
+
+ASSETS = Assets("static", os.environ.get("lonelyconnect_assets", "assets"))
@@ -1,31 +1,38 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 
-from .models import User
+from . import credentials, rooms, stats
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")  # camel case because OpenAPI
-TOKENS = {}
-USERS = {
-    "admin": User(name="admin"),
-    "left": User(name="left"),
-    "right": User(name="right"),
-}
-CODES = {}
+# the default room's; other rooms have their own
+TOKENS = rooms.DEFAULT.tokens
+USERS = rooms.DEFAULT.users
+CODES = rooms.DEFAULT.codes
 
 
-def logged_in(token: str = Depends(oauth2_scheme)):
+def username(token, room):
+    """Whose token it is, or None."""
+    claims = credentials.verify(token, room.id)
+    if claims:
+        return None if claims.nonce in room.revoked else claims.username
+    return room.tokens.get(token)
+
+
+def logged_in(token: str = Depends(oauth2_scheme), room=Depends(rooms.get)):
     try:
-        return USERS[TOKENS[token]]
+        user = room.users[username(token, room)]
     except KeyError:
         raise HTTPException(
             status_code=401,
             detail="Only accessible to logged in users",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    stats.ACTIVE.seen("admin" if user.is_admin else "player", (room.id, user.name))
+    return user
 
 
-def player(token: str = Depends(oauth2_scheme)):
-    user = logged_in(token)
+def player(token: str = Depends(oauth2_scheme), room=Depends(rooms.get)):
+    user = logged_in(token, room)
     if not user.is_player:
         raise HTTPException(
             status_code=403,
@@ -35,8 +42,8 @@ def player(token: str = Depends(oauth2_scheme)):
     return user
 
 
-def admin(token: str = Depends(oauth2_scheme)):
-    user = logged_in(token)
+def admin(token: str = Depends(oauth2_scheme), room=Depends(rooms.get)):
+    user = logged_in(token, room)
     if not user.is_admin:
         raise HTTPException(
             status_code=403,
@@ -44,3 +51,8 @@ def admin(token: str = Depends(oauth2_scheme)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     return user
+
+
+def server_admin(token: str = Depends(oauth2_scheme)):
+    """The admin of the default room, who can manage the other rooms."""
+    return admin(token, rooms.DEFAULT)
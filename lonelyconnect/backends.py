@@ -0,0 +1,256 @@
+import os
+import pickle
+import sqlite3
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .commands import COMMANDS
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """Rooms only exist in this process. Only works with a single worker."""
+
+    shared = False
+
+    def execute(self, room, command, args):
+        return COMMANDS[command](room, *args)
+
+    async def run(self, room, command, args):
+        """execute(), for the room's writer."""
+        return self.execute(room, command, args)
+
+    def add(self, room):
+        pass
+
+    def fetch(self, room_id, make_room):
+        return None
+
+    def remove(self, room_id):
+        pass
+
+    async def watch(self, rooms, keep):
+        pass
+
+
+class Detached:
+    """
+    What commands change of a room, unpickled from the database on its own,
+    so that they can run on it away from the event loop.
+    """
+
+    def __init__(self, room_id, state):
+        self.id = room_id
+        self.game, self.users, self.tokens, self.codes, self.revoked = state
+
+    @property
+    def state(self):
+        return self.game, self.users, self.tokens, self.codes, self.revoked
+
+
+class SQLiteBackend:
+    """
+    Rooms are stored in an SQLite database that all workers share. Commands
+    run in a write transaction on the latest state, so they are applied one
+    after the other no matter which worker gets them; every worker keeps a
+    copy of each room in memory to answer reads from.
+
+    Waiting for other workers' transactions and (un)pickling states happens
+    in a thread of its own (on a connection of its own), so that buzzers in
+    all rooms don't wait for it.
+    """
+
+    shared = True
+    POLL_INTERVAL = 0.2  # seconds between checks for changes by other workers
+
+    def __init__(self, path):
+        self.path = path
+        # for the event loop, which can't wait long
+        self.db = sqlite3.connect(path, isolation_level=None, timeout=2)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS rooms (
+                id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                state BLOB NOT NULL
+            )
+            """)
+        self.thread = ThreadPoolExecutor(1, thread_name_prefix="sqlite")
+        self.thread_db = None  # connected by the thread, when it first needs it
+
+    def _thread_db(self):
+        if self.thread_db is None:
+            self.thread_db = sqlite3.connect(
+                self.path, isolation_level=None, timeout=30
+            )
+        return self.thread_db
+
+    def _refresh(self, room, version, state):
+        if version != room.stored_version:
+            room.state = pickle.loads(state)
+            room.stored_version = version
+            return True
+        return False
+
+    def execute(self, room, command, args):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.db.execute(
+                "SELECT version, state FROM rooms WHERE id = ?", (room.id,)
+            ).fetchone()
+            if row:
+                self._refresh(room, *row)
+            else:
+                # the default room exists in every worker, but not in a new file
+                self.db.execute(
+                    "INSERT INTO rooms VALUES (?, 0, ?)",
+                    (room.id, pickle.dumps(room.state)),
+                )
+                room.stored_version = 0
+            result = COMMANDS[command](room, *args)
+            self.db.execute(
+                "UPDATE rooms SET version = version + 1, state = ? WHERE id = ?",
+                (pickle.dumps(room.state), room.id),
+            )
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            # the command might have half-changed our copy
+            room.stored_version = None
+            raise
+        room.stored_version += 1
+        return result
+
+    def _execute_detached(self, room, command, args):
+        """
+        In self.thread: execute() on a Detached copy of the room's latest
+        state; its result, and the new version and state of the room.
+        """
+        db = self._thread_db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(
+                "SELECT version, state FROM rooms WHERE id = ?", (room.id,)
+            ).fetchone()
+            if not row:
+                # the default room exists in every worker, but not in a new
+                # file; nothing but its writer (waiting for us) changes it
+                row = 0, pickle.dumps(room.state)
+                db.execute("INSERT INTO rooms VALUES (?, ?, ?)", (room.id, *row))
+            version, state = row
+            detached = Detached(room.id, pickle.loads(state))
+            result = COMMANDS[command](detached, *args)
+            db.execute(
+                "UPDATE rooms SET version = version + 1, state = ? WHERE id = ?",
+                (pickle.dumps(detached.state), room.id),
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return result, version + 1, detached.state
+
+    async def run(self, room, command, args):
+        """execute(), for the room's writer; the room only changes if it works."""
+        result, version, state = await asyncio.get_running_loop().run_in_executor(
+            self.thread, self._execute_detached, room, command, args
+        )
+        if newer(version, room.stored_version):
+            room.state = state
+            room.stored_version = version
+        return result
+
+    def add(self, room):
+        self.db.execute(
+            "INSERT INTO rooms VALUES (?, 0, ?)", (room.id, pickle.dumps(room.state))
+        )
+        room.stored_version = 0
+
+    def fetch(self, room_id, make_room):
+        row = self.db.execute(
+            "SELECT version, state FROM rooms WHERE id = ?", (room_id,)
+        ).fetchone()
+        if not row:
+            return None
+        room = make_room(room_id)
+        self._refresh(room, *row)
+        return room
+
+    def remove(self, room_id):
+        self.db.execute("DELETE FROM rooms WHERE id = ?", (room_id,))
+
+    def changes(self, known, db=None):
+        """
+        The version and state of the rooms in known (id -> the version we
+        have) that other workers changed since, and None for those they
+        deleted.
+        """
+        db = db or self._thread_db()
+        versions = dict(db.execute("SELECT id, version FROM rooms"))
+        found = {}
+        for room_id, ours in known.items():
+            if room_id not in versions:
+                found[room_id] = None
+            elif versions[room_id] != ours:
+                row = db.execute(
+                    "SELECT version, state FROM rooms WHERE id = ?", (room_id,)
+                ).fetchone()
+                if row:
+                    found[room_id] = row[0], pickle.loads(row[1])
+        return found
+
+    def apply(self, rooms, found, keep):
+        """Take over what changes() found, except for deleting `keep`."""
+        for room_id, change in found.items():
+            room = rooms.get(room_id)
+            if room is None:
+                continue
+            if change is None:
+                if room.stored_version is not None and room_id != keep:
+                    del rooms[room_id]  # deleted by another worker
+            elif newer(change[0], room.stored_version):
+                room.state = change[1]
+                room.stored_version = change[0]
+                room.changes.notify()
+
+    def poll(self, rooms, keep):
+        """
+        Pick up changes that other workers made to our rooms, and forget
+        rooms they deleted (except for `keep`).
+        """
+        known = {room_id: room.stored_version for room_id, room in rooms.items()}
+        self.apply(rooms, self.changes(known, self.db), keep)
+
+    async def watch(self, rooms, keep):
+        """poll() all the time, reading the database in self.thread."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.POLL_INTERVAL)
+            known = {room_id: room.stored_version for room_id, room in rooms.items()}
+            try:
+                found = await loop.run_in_executor(self.thread, self.changes, known)
+                self.apply(rooms, found, keep)
+            except Exception:
+                # e.g. the database was locked for too long; maybe not next time
+                logger.exception("Couldn't pick up the changes of other workers")
+
+
+def newer(version, ours):
+    """Whether version of a room is newer than ours (None: don't know)."""
+    return ours is None or version > ours
+
+
+def from_environment():
+    """
+    lonelyconnect_backend selects the backend: unset or "memory" for the
+    in-process default, "sqlite:<path>" for one shared by several workers.
+    """
+    spec = os.environ.get("lonelyconnect_backend", "memory")
+    if spec == "memory":
+        return MemoryBackend()
+    kind, _, path = spec.partition(":")
+    if kind == "sqlite" and path:
+        return SQLiteBackend(path)
+    raise ValueError(f"Unknown backend: {spec}")
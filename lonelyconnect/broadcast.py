@@ -0,0 +1,34 @@
+import asyncio
+
+
+class Broadcast:
+    """Wake up everyone waiting for the game state to change."""
+
+    def __init__(self):
+        self.count = 0
+        # created lazily, so that it belongs to whatever loop is running
+        self._event = None
+
+    def notify(self):
+        self.count += 1
+        if self._event:
+            self._event.set()
+        self._event = None
+
+    async def wait(self, seen, timeout=None):
+        """
+        Wait until there was a notify() after `seen` (a previous value of
+        self.count); return False on timeout.
+        """
+        if self.count != seen:
+            return True
+        if not self._event:
+            self._event = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+CHANGES = Broadcast()
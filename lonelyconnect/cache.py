@@ -0,0 +1,73 @@
+import secrets
+from collections import OrderedDict
+
+from starlette.responses import Response
+
+from .responses import FastJSONResponse
+
+# versions start over with every process, tags from earlier ones mustn't match
+BOOT = secrets.token_hex(4)
+
+
+def etag(game):
+    return f'"{BOOT}-{game.state_tag}"'
+
+
+def is_fresh(request, tag):
+    """Whether the client told us it already has the response tagged `tag`."""
+    candidates = request.headers.get("if-none-match")
+    if not candidates:
+        return False
+    return any(
+        candidate.strip().removeprefix("W/") in (tag, "*")
+        for candidate in candidates.split(",")
+    )
+
+
+def conditional(request, game, make_response):
+    """
+    Answer with 304 if the client already has the current state of the game,
+    otherwise with make_response() (a Response, or something to send as JSON).
+    """
+    tag = etag(game)
+    headers = {"ETag": tag, "Cache-Control": "no-cache"}
+    if is_fresh(request, tag):
+        return Response(status_code=304, headers=headers)
+    response = make_response()
+    if not isinstance(response, Response):
+        response = FastJSONResponse(response)
+    response.headers.update(headers)
+    return response
+
+
+class RenderCache:
+    """
+    Rendered bodies for the most recently used keys; a key should contain
+    everything that the body depends on.
+    """
+
+    def __init__(self, size=128):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        """Return what render() returned for `key`, calling it if needed."""
+        try:
+            body = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            body = self.entries[key] = render()
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return body
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+
+RENDERS = RenderCache()
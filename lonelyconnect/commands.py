@@ -0,0 +1,77 @@
+"""
+Everything that changes a room. Every command takes the room and arguments
+that can be stored as JSON, and is run through Room.submit().
+"""
+
+from . import credentials, game
+
+
+def load(room, pack, seed=None, choices=None):
+    room.game = game.Game()
+    # with the seed (and choices), replaying this command gives the same game
+    room.game.load_pack(pack, seed, choices)
+
+
+def action(room, key):
+    return room.game.action(key)
+
+
+def buzz(room, who):
+    return room.game.buzz(who)
+
+
+def expire(room):
+    # run when the timer runs out, see Room.schedule_expiry()
+    room.game.expire()
+
+
+def set_buzz(room, state):
+    room.game.buzz_state = state
+    return state
+
+
+def score(room, team, points):
+    room.game.points[team] += points
+    room.game.touch()
+
+
+def name(room, team, descriptive_name):
+    room.users[team].descriptive_name = descriptive_name
+    room.game.touch()
+
+
+def pair(room, code, username, now=None):
+    # given the time, replaying this command gives the same expiry
+    room.codes.add(code, username, now)
+
+
+def login(room, code, token, now=None):
+    # signed tokens (token None) aren't stored, see credentials.sign()
+    username = room.codes.pop(code, now=now)
+    if username and token:
+        room.tokens.add(token, username, now)
+    return username
+
+
+def logout(room, token):
+    if room.tokens.pop(token) is None:
+        claims = credentials.verify(token, room.id)
+        if claims:
+            room.revoked.add(claims.nonce, claims.username, expires=claims.expires)
+
+
+COMMANDS = {
+    command.__name__: command
+    for command in (
+        load,
+        action,
+        buzz,
+        expire,
+        set_buzz,
+        score,
+        name,
+        pair,
+        login,
+        logout,
+    )
+}
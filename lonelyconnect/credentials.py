@@ -0,0 +1,157 @@
+"""
+Login tokens and pairing codes, which come and go during a long event with
+many reconnecting devices, but should neither pile up nor be slow to find.
+"""
+
+import os
+import hmac
+import time
+import base64
+import hashlib
+import secrets
+import functools
+from typing import NamedTuple
+from collections.abc import Mapping
+
+# seconds until a token or code stops working
+TOKEN_TTL = float(os.environ.get("lonelyconnect_token_ttl", 3 * 24 * 60 * 60))
+CODE_TTL = float(os.environ.get("lonelyconnect_code_ttl", 24 * 60 * 60))
+# with this, tokens are signed instead of stored, see sign()
+SECRET = os.environ.get("lonelyconnect_token_secret")
+
+
+class Credentials(Mapping):
+    """
+    Secrets (tokens or codes) and whose they are, for as long as they work:
+    reading it as a mapping only shows the ones that haven't expired. Each
+    user keeps only their `keep` latest secrets (unless keep is None), and
+    adding a secret forgets expired ones, so it stays small no matter how
+    long the event goes on.
+    """
+
+    def __init__(self, ttl, keep=None):
+        self.ttl = ttl
+        self.keep = keep
+        # secret -> (username, expiry as time.time()), in the order they came
+        self.entries = {}
+        # username -> their secrets, in the same order (the values are unused)
+        self.by_user = {}
+
+    def __getitem__(self, secret):
+        return self._get(secret, time.time())
+
+    def _get(self, secret, now):
+        username, expires = self.entries[secret]
+        if expires <= now:
+            raise KeyError(secret)
+        return username
+
+    def __iter__(self):
+        now = time.time()
+        return (
+            secret for secret, (_, expires) in self.entries.items() if expires > now
+        )
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def newest(self, username):
+        """The user's latest secret, or None."""
+        secrets = self.by_user.get(username)
+        secret = secrets and next(reversed(secrets))
+        return secret if secret in self else None
+
+    def add(self, secret, username, now=None, expires=None):
+        now = time.time() if now is None else now
+        self.pop(secret)
+        self.entries[secret] = username, expires or now + self.ttl
+        secrets = self.by_user.setdefault(username, {})
+        secrets[secret] = None
+        if self.keep is not None and len(secrets) > self.keep:
+            self.pop(next(iter(secrets)))
+        # they come in the order they expire, give or take restored ones
+        while self.entries:
+            oldest = next(iter(self.entries))
+            if self.entries[oldest][1] > now:
+                break
+            self.pop(oldest)
+
+    def pop(self, secret, default=None, now=None):
+        """Remove the secret; return whose it was if it still worked (at now)."""
+        try:
+            username = self._get(secret, time.time() if now is None else now)
+        except KeyError:
+            username = default
+        entry = self.entries.pop(secret, None)
+        if entry:
+            del self.by_user[entry[0]][secret]
+        return username
+
+    def clear(self):
+        self.entries.clear()
+        self.by_user.clear()
+
+    def update(self, other, now=None):
+        """Add the secrets of other, one of these or what dump() returned."""
+        entries = other.entries if isinstance(other, Credentials) else other
+        for secret, (username, expires) in entries.items():
+            self.add(secret, username, now, expires)
+
+    def dump(self):
+        return {secret: list(entry) for secret, entry in self.entries.items()}
+
+
+def tokens():
+    # one for every device a user logged in on
+    return Credentials(TOKEN_TTL, keep=16)
+
+
+def codes():
+    return Credentials(CODE_TTL, keep=4)
+
+
+def revoked():
+    # signed tokens that were logged out, until they would have expired anyway;
+    # forgetting one any earlier would make it work again
+    return Credentials(TOKEN_TTL)
+
+
+class Claims(NamedTuple):
+    username: str
+    room_id: str
+    expires: int
+    nonce: str  # what it is revoked by
+
+
+@functools.lru_cache(maxsize=4)
+def _key(secret):
+    return hashlib.sha256(secret.encode()).digest()
+
+
+def _mac(claims, secret):
+    # keyed BLAKE2 is a MAC as good as HMAC, at a fraction of the cost
+    digest = hashlib.blake2b(claims.encode(), key=_key(secret), digest_size=16)
+    return base64.urlsafe_b64encode(digest.digest()).rstrip(b"=").decode()
+
+
+def sign(username, room_id, expires, secret=None):
+    """
+    A token that says whose it is, for which room and until when, signed
+    with SECRET: checking it needs no lookup, so any worker can do it.
+    """
+    claims = f"{username}.{room_id}.{int(expires)}.{secrets.token_urlsafe(6)}"
+    return f"{claims}.{_mac(claims, secret or SECRET)}"
+
+
+def verify(token, room_id, now=None, secret=None):
+    """The Claims of a token from sign() for the room, or None."""
+    secret = secret or SECRET
+    if not secret or "." not in token:
+        return None  # not signed, or we don't sign
+    claims, _, mac = token.rpartition(".")
+    if not hmac.compare_digest(mac, _mac(claims, secret)):
+        return None
+    username, token_room, expires, nonce = claims.split(".")
+    if token_room != room_id or int(expires) <= (now or time.time()):
+        return None
+    return Claims(username, token_room, int(expires), nonce)
@@ -1,28 +1,104 @@
 import random
+import itertools
 from time import monotonic
 from collections import deque
 
+from . import packs
+
+# shared by all games, so that no two states of any games have the same version
+VERSIONS = itertools.count()
+
 
 class Game:
     def __init__(self):
         self.parts = deque()
         self.part = None
+        self.version = next(VERSIONS)
         self.buzz_state = "inactive"
         self.points = {
             "left": 0,
             "right": 0,
         }
+        self.pack = None  # hash of the loaded pack, see packs.py
+        self.seed = None
+        self.choices = None  # which items of the pack each part uses
 
     @property
     def is_done(self):
         return not self.parts and not self.part
 
-    def load(self, game_data):
+    @property
+    def timer(self):
+        return getattr(self.part and self.part.task, "timer", None)
+
+    @property
+    def state_tag(self):
+        """
+        Changes whenever anything visible changes. A running timer doesn't
+        count, clients count it down by themselves (see Timer.stage()).
+        """
+        return str(self.version)
+
+    def touch(self):
+        """Note that the state was changed."""
+        self.version = next(VERSIONS)
+
+    @property
+    def buzz_state(self):
+        return self._buzz_state
+
+    @buzz_state.setter
+    def buzz_state(self, value):
+        self._buzz_state = value
+        self.touch()
+
+    def load(self, game_data, seed=None):
         """Given data from a file, load questions or whatever exists in this game"""
-        for part_data in game_data["parts"]:
+        self.load_pack(packs.PACKS.add(game_data), seed)
+
+    def load_pack(self, pack, seed=None, choices=None, seen=None):
+        """
+        Load the pack with the given hash (see packs.py). The same pack and
+        seed always give the same game. Parts choose their items avoiding
+        those in seen (see seen.py, None if not playing for a league), unless
+        told which with choices.
+        """
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.pack, self.seed = pack, seed
+        rng = random.Random(seed)
+        for i, part_data in enumerate(packs.PACKS.get(pack)["parts"]):
             part = PART_TYPES[part_data["type"]](self)
-            part.load(part_data)
+            # parts get their own, so that they don't depend on how much of
+            # it the previous part used up choosing
+            part_rng = random.Random(rng.getrandbits(32))
+            part.load(part_data, part_rng, choices and choices[i], seen)
             self.parts.append(part)
+        self.choices = [part.choice for part in self.parts]
+        self.touch()
+
+    def dump_state(self):
+        """Everything that changed since loading the pack, see snapshots.py."""
+        return {
+            "pack": self.pack,
+            "seed": self.seed,
+            "choices": self.choices,
+            "parts_left": len(self.parts),
+            "part": self.part and self.part.dump_state(),
+            "points": self.points,
+            "buzz_state": self.buzz_state,
+        }
+
+    def restore_state(self, state):
+        if state["pack"]:
+            self.load_pack(state["pack"], state["seed"], state["choices"])
+        while len(self.parts) > state["parts_left"] + bool(state["part"]):
+            self.parts.popleft()
+        if state["part"]:
+            self.part = self.parts.popleft()
+            self.part.restore_state(state["part"])
+        self.points = state["points"]
+        self.buzz_state = state["buzz_state"]
 
     def secrets(self):
         """Return data for the current stage."""
@@ -47,6 +123,7 @@ class Game:
 
     def action(self, key):
         """Perform an action"""
+        self.touch()
         if self.part:
             try:
                 return self.part.action(key)
@@ -62,6 +139,19 @@ class Game:
         else:
             return None
 
+    def expire(self):
+        """The timer ran out, apply what that means."""
+        if self.part:
+            self.part.expire()
+
+    def buzzer_state(self, who):
+        """How the buzzer of the given team should look right now."""
+        if self.buzz_state == who:
+            return "buzzed"
+        elif self.buzz_state in ("active", f"active-{who}"):
+            return "buzzable"
+        return "inactive"
+
     def buzz(self, who):
         if self.buzz_state in ("active", f"active-{who}"):
             if self.part:
@@ -78,6 +168,19 @@ class Part:
         self.task = None
         self.tasks = deque()
 
+    def dump_state(self):
+        return {
+            "tasks_left": len(self.tasks),
+            "task": self.task and self.task.dump_state(),
+        }
+
+    def restore_state(self, state):
+        while len(self.tasks) > state["tasks_left"] + bool(state["task"]):
+            self.tasks.popleft()
+        if state["task"]:
+            self.task = self.make_task(self.tasks.popleft())
+            self.task.restore_state(state["task"])
+
     def secrets(self):
         if self.task:
             return self.task.secrets()
@@ -101,11 +204,11 @@ class Part:
                 return self.task.action(key)
             except StopIteration:
                 if self.tasks:
-                    self.task = self.tasks.popleft()
+                    self.task = self.make_task(self.tasks.popleft())
                 else:
                     self.task = None
         elif self.tasks:
-            self.task = self.tasks.popleft()
+            self.task = self.make_task(self.tasks.popleft())
         else:
             raise StopIteration  # out of tasks
 
@@ -113,17 +216,64 @@ class Part:
         if self.task and hasattr(self.task, "buzz"):
             self.task.buzz(who)
 
+    def expire(self):
+        if self.task and hasattr(self.task, "expire"):
+            self.task.expire()
+
 
 class MissingVowels(Part):
+    # more groups than teams get through before the timer runs out; only
+    # games for a league stop there, to leave the rest for their next game
+    GROUPS = 10
+
     def __init__(self, game):
         super().__init__(game)
         self.timer = None
 
-    def load(self, part_data):
-        groups = part_data["groups"]
-        random.shuffle(groups)
-        for group_data in groups:
-            self.tasks.append(MissingVowelGroup(group_data, self))
+    @staticmethod
+    def validate(part_data):
+        groups = part_data.get("groups")
+        check(isinstance(groups, list) and groups, "needs a list of groups")
+        for i, group_data in enumerate(groups, 1):
+            check(isinstance(group_data, dict), f"group {i} isn't a mapping")
+            check("name" in group_data, f"group {i} has no name")
+            phrases = group_data.get("phrases")
+            check(
+                isinstance(phrases, list) and phrases,
+                f"group {i} needs a list of phrases",
+            )
+            for phrase_data in phrases:
+                check(
+                    isinstance(phrase_data, str)
+                    or isinstance(phrase_data, dict)
+                    and {"answer", "obfuscated"} <= phrase_data.keys(),
+                    f"group {i} has a phrase that is neither text nor has an"
+                    " answer and an obfuscated version",
+                )
+
+    def load(self, part_data, rng=random, choice=None, seen=None):
+        self.items = part_data["groups"]
+        # every group gets a seed, so that it obfuscates the same way no matter
+        # when it is made (or how it was chosen)
+        seed = rng.getrandbits(32)
+        if choice is None:
+            # all of them, or for a league as many as a round can use (and
+            # it sees), unseen ones first
+            count = len(self.items) if seen is None else self.GROUPS
+            choice = sample_unseen(rng, self.items, count, seen)
+        self.choice = choice
+        self.tasks.extend((i, seed + i) for i in choice)
+
+    def make_task(self, task):
+        i, seed = task
+        return MissingVowelGroup(self.items[i], self, random.Random(seed))
+
+    def dump_state(self):
+        return {**super().dump_state(), "timer": self.timer and self.timer.dump()}
+
+    def restore_state(self, state):
+        super().restore_state(state)
+        self.timer = state["timer"] and Timer.restore(state["timer"])
 
     def action(self, key):
         if key == "next":
@@ -135,21 +285,47 @@ class MissingVowels(Part):
 
 
 class Connections(Part):
-    def load(self, part_data):
-        """Given part data, load questions or other tasks (theoretically)."""
-        questions = part_data["questions"]
-        random.shuffle(questions)
-        for _, question_data in zip(range(6), questions):
-            self.tasks.append(Question(question_data, self))
+    @staticmethod
+    def validate(part_data):
+        questions = part_data.get("questions")
+        check(isinstance(questions, list) and questions, "needs a list of questions")
+        for i, question_data in enumerate(questions, 1):
+            check(isinstance(question_data, dict), f"question {i} isn't a mapping")
+            for key in ("answer", "explanation", "steps"):
+                check(key in question_data, f"question {i} has no {key}")
+            steps = question_data["steps"]
+            check(
+                isinstance(steps, list) and len(steps) >= 4,
+                f"question {i} needs at least 4 steps",
+            )
+            for step_data in steps:
+                check(
+                    isinstance(step_data, dict) and "label" in step_data,
+                    f"question {i} has a step without label",
+                )
+
+    def load(self, part_data, rng=random, choice=None, seen=None):
+        """
+        Given part data, choose questions or other tasks (theoretically), which
+        are only made when they come up.
+        """
+        self.items = part_data["questions"]
+        if choice is None:
+            choice = sample_unseen(rng, self.items, 6, seen)
+        self.choice = choice
+        self.tasks.extend(choice)
+
+    def make_task(self, i):
+        return Question(self.items[i], self)
 
 
 class Sequences(Part):
-    def load(self, part_data):
-        """Given part data, load questions or other tasks (theoretically)."""
-        questions = part_data["questions"]
-        random.shuffle(questions)
-        for _, question_data in zip(range(6), questions):
-            self.tasks.append(Question(question_data, self, is_sequences=True))
+    validate = Connections.validate
+
+    load = Connections.load
+
+    def make_task(self, i):
+        return Question(self.items[i], self, is_sequences=True)
 
 
 class Task:
@@ -162,11 +338,11 @@ class Task:
 
 
 class MissingVowelGroup(Task):
-    def __init__(self, task_data, part):
+    def __init__(self, task_data, part, rng=random):
         self.part = part
         self.name = task_data["name"]
         self.phrases = deque(
-            Phrase(phrase_data) for phrase_data in task_data["phrases"]
+            Phrase(phrase_data, rng) for phrase_data in task_data["phrases"]
         )
         self.phrase = None
         self.clear = False
@@ -175,6 +351,20 @@ class MissingVowelGroup(Task):
     def timer(self):
         return self.part.timer
 
+    def dump_state(self):
+        return {
+            "phrases_left": len(self.phrases),
+            "phrase": self.phrase is not None,
+            "clear": self.clear,
+        }
+
+    def restore_state(self, state):
+        while len(self.phrases) > state["phrases_left"] + state["phrase"]:
+            self.phrases.popleft()
+        if state["phrase"]:
+            self.phrase = self.phrases.popleft()
+        self.clear = state["clear"]
+
     def secrets(self):
         if self.phrase:
             return {
@@ -184,8 +374,7 @@ class MissingVowelGroup(Task):
 
     def stage(self):
         stage_data = {
-            "time_remaining": self.timer and self.timer.remaining_round,
-            "time_total": self.timer and self.timer.duration,
+            **(self.timer.stage() if self.timer else NO_TIMER),
             "name": self.name,
         }
         if self.phrase:
@@ -243,6 +432,18 @@ class Question(Task):
     def clear(self):
         return self.n_shown > 4
 
+    def dump_state(self):
+        return {
+            "active_team": self.active_team,
+            "n_shown": self.n_shown,
+            "timer": self.timer and self.timer.dump(),
+        }
+
+    def restore_state(self, state):
+        self.active_team = state["active_team"]
+        self.n_shown = state["n_shown"]
+        self.timer = state["timer"] and Timer.restore(state["timer"])
+
     def secrets(self):
         return {
             "step_explanations": [
@@ -252,12 +453,6 @@ class Question(Task):
         }
 
     def stage(self):
-        if (
-            self.timer
-            and not self.timer.remaining
-            and self.game.buzz_state != "inactive"
-        ):
-            self.game.buzz_state = "inactive"
         steps = [
             {
                 key: getattr(step, key)
@@ -274,8 +469,7 @@ class Question(Task):
         return {
             "steps": steps,
             "answer": self.answer if self.n_shown == 5 else None,
-            "time_remaining": self.timer and self.timer.remaining_round,
-            "time_total": self.timer and self.timer.duration,
+            **(self.timer.stage() if self.timer else NO_TIMER),
             "clear": self.clear,
         }
 
@@ -302,8 +496,6 @@ class Question(Task):
                     ("no_points", "No points for either team"),
                 ],
             )
-        if self.n_shown < 4 and self.timer and not self.timer.remaining:
-            self.n_shown = 4
         if self.n_shown == 4 and self.timer and not self.timer.remaining:
             # other team didn't buzz, but we showed all
             available.extend(
@@ -321,6 +513,14 @@ class Question(Task):
             self.timer.freeze()
         # self.active_team = who  # shouldn't be neccessary
 
+    def expire(self):
+        """No more buzzing, and the other team gets to see all clues."""
+        if not self.timer or self.timer.frozen or self.clear:
+            return
+        self.timer.run_out()
+        self.n_shown = 4
+        self.game.buzz_state = "inactive"
+
     def action(self, key):
         """Perform an action"""
         if key not in [k for (k, _desc) in self.actions()]:
@@ -357,20 +557,20 @@ class Question(Task):
                 raise StopIteration("Out of steps")
 
 
-def obfuscate(string):
+def obfuscate(string, rng=random):
     chars = [char for char in string.upper() if char not in "AEIOUÄÖÜ "]
     return "".join(
-        char if not i or random.random() > 0.2 else f" {char}"
+        char if not i or rng.random() > 0.2 else f" {char}"
         for i, char in enumerate(chars)
     )
 
 
 class Phrase:
-    def __init__(self, phrase_data):
+    def __init__(self, phrase_data, rng=random):
         if isinstance(phrase_data, str):
             # automatically obfuscate
             self.answer = phrase_data.upper()
-            self.obfuscated = obfuscate(phrase_data)
+            self.obfuscated = obfuscate(phrase_data, rng)
         else:
             self.answer = phrase_data["answer"].upper()
             self.obfuscated = phrase_data["obfuscated"].upper()
@@ -383,6 +583,9 @@ class Step:
         self.type = step_data.get("type", "text")
 
 
+NO_TIMER = {"time_total": None, "time_remaining": None, "time_frozen": None}
+
+
 class Timer:
     def __init__(self, seconds):
         self.end = monotonic() + seconds
@@ -399,12 +602,44 @@ class Timer:
         return self.end - now
 
     @property
-    def remaining_round(self):
-        return int(self.remaining)
+    def frozen(self):
+        return bool(self._remaining)
 
     def freeze(self):
         self._remaining = self.remaining
 
+    def run_out(self):
+        """End now, e.g. when replaying the command that ended it."""
+        self.end = min(self.end, monotonic())
+
+    def stage(self):
+        """
+        What clients need to show the timer: how much is left, or was left
+        when it stopped. They count down from when they got it, so their
+        clocks needn't agree with ours (see rooms.View.timer()).
+        """
+        return {
+            "time_total": self.duration,
+            "time_remaining": None if self.frozen else round(self.remaining, 3),
+            "time_frozen": round(self._remaining, 3) if self.frozen else None,
+        }
+
+    def dump(self):
+        # not self.end: monotonic time means nothing to another process
+        return {
+            "duration": self.duration,
+            "remaining": self.remaining,
+            "frozen": self.frozen,
+        }
+
+    @classmethod
+    def restore(cls, state):
+        timer = cls(state["duration"])
+        timer.end = monotonic() + state["remaining"]
+        if state["frozen"]:
+            timer._remaining = state["remaining"]
+        return timer
+
 
 PART_TYPES = {
     "connections": Connections,
@@ -412,4 +647,63 @@ PART_TYPES = {
     "missing vowels": MissingVowels,
 }
 
+
+def sample_unseen(rng, items, count, seen=None):
+    """
+    Indices of count random items, preferring those whose key isn't in seen;
+    only if there aren't enough of them, seen ones are used as well.
+    """
+    count = min(count, len(items))
+    if not seen:
+        return rng.sample(range(len(items)), count)
+    chosen, skipped, tried = [], [], set()
+    # probing at random only looks at a few items, as long as most are unseen
+    while len(chosen) < count and len(tried) < len(items) // 2:
+        i = rng.randrange(len(items))
+        if i not in tried:
+            tried.add(i)
+            (skipped if items.key(i) in seen else chosen).append(i)
+    if len(chosen) < count:
+        rest = [i for i in range(len(items)) if i not in tried]
+        rng.shuffle(rest)
+        for i in rest:
+            if len(chosen) == count:
+                break
+            (skipped if items.key(i) in seen else chosen).append(i)
+    return (chosen + skipped)[:count]
+
+
+def choose(pack, seed, seen):
+    """
+    Which items of the pack a game with that seed would use, avoiding those
+    in seen; and the keys of them.
+    """
+    game = Game()
+    game.load_pack(pack, seed, seen=seen)
+    keys = [part.items.key(i) for part in game.parts for i in part.choice]
+    return game.choices, keys
+
+
+def check(condition, message):
+    if not condition:
+        raise ValueError(message)
+
+
+def validate(game_data):
+    """Raise ValueError unless game_data is a game that can be loaded."""
+    check(
+        isinstance(game_data, dict) and isinstance(game_data.get("parts"), list),
+        "A game needs a list of parts",
+    )
+    for i, part_data in enumerate(game_data["parts"], 1):
+        check(
+            isinstance(part_data, dict) and part_data.get("type") in PART_TYPES,
+            f"Part {i} has none of the types {', '.join(PART_TYPES)}",
+        )
+        try:
+            PART_TYPES[part_data["type"]].validate(part_data)
+        except ValueError as e:
+            raise ValueError(f"Part {i} ({part_data['type']}) {e}")
+
+
 GAME = Game()
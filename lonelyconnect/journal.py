@@ -0,0 +1,157 @@
+import os
+import json
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Journal:
+    """
+    Write-ahead log of every command, so that a crash loses (almost) nothing.
+
+    Appending only queues the entry; a background task writes and fsyncs
+    whatever was queued in one go, off the event loop. Every SNAPSHOT_EVERY
+    entries the whole state is written as a snapshot instead, and the log
+    starts over, so that recovering never has to replay much.
+    """
+
+    FLUSH_INTERVAL = 0.05  # seconds of commands we may lose in a crash
+    SNAPSHOT_EVERY = 1000  # entries
+
+    def __init__(self, snapshot_path="swap.bin", log_path="swap.log"):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        self.seq = 0
+        self.pending = []
+        self.since_snapshot = 0
+        self.log = None
+        # the log is written from executor threads and from close()
+        self.lock = threading.Lock()
+
+    def append(self, room_id, command, args):
+        # serialized right away: commands may modify their arguments
+        self.seq += 1
+        self.pending.append(
+            json.dumps([self.seq, room_id, command, args], default=str) + "\n"
+        )
+        self.since_snapshot += 1
+
+    def recover(self, restore, replay):
+        """
+        Call restore() with the rooms from the last snapshot, then replay()
+        with every command logged after it; then start logging.
+        """
+        self.resume(restore, replay, *self.read())
+
+    def read(self):
+        """
+        The rooms from the last snapshot (or None) and the entries logged
+        after it, for resume(); only reads files, so it can run in a thread.
+        """
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = None
+        seq = self.seq
+        if not data:
+            states = None
+        elif data.startswith(b"{"):
+            snapshot = json.loads(data)
+            seq, states = snapshot["seq"], snapshot["rooms"]
+        else:
+            # a game pickled by a version from before there were rooms, which
+            # today's games can't be made of; kept, but not written over
+            states = None
+            logger.error(
+                "%s is from an older version and can't be restored; "
+                "starting without it (moved to %s.old)",
+                self.snapshot_path,
+                self.snapshot_path,
+            )
+            os.replace(self.snapshot_path, f"{self.snapshot_path}.old")
+        entries = []
+        last = seq
+        try:
+            with open(self.log_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # torn write at the moment of the crash
+                    if entry[0] <= last:
+                        continue  # already part of the snapshot
+                    last = entry[0]
+                    entries.append(entry)
+        except FileNotFoundError:
+            pass
+        return seq, states, entries
+
+    def resume(self, restore, replay, seq, states, entries):
+        """Apply what read() found, then start logging."""
+        self.seq = seq
+        if states is not None:
+            restore(states)
+        for seq, room_id, command, args in entries:
+            self.seq = seq
+            try:
+                replay(room_id, command, args)
+            except Exception:
+                # failed the first time as well, but maybe not before
+                # changing something
+                pass
+        if entries:
+            logger.info("replayed %s commands from %s", len(entries), self.log_path)
+        self.since_snapshot = len(entries)
+        self.log = open(self.log_path, "a")
+
+    def write(self, lines):
+        with self.lock:
+            self.log.writelines(lines)
+            self.log.flush()
+            os.fsync(self.log.fileno())
+
+    def take_snapshot(self, states):
+        """Encode states; the queued entries are part of it now."""
+        self.pending = []
+        self.since_snapshot = 0
+        return json.dumps(
+            {"seq": self.seq, "rooms": states}, separators=(",", ":")
+        ).encode()
+
+    def write_snapshot(self, data):
+        with self.lock:
+            temporary = f"{self.snapshot_path}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, self.snapshot_path)
+            # if we crash before this, recover() skips what's in the snapshot
+            self.log.truncate(0)
+            os.fsync(self.log.fileno())
+
+    async def run(self, states):
+        """Write queued entries in the background; states() gives the rooms."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            if self.since_snapshot >= self.SNAPSHOT_EVERY:
+                data = self.take_snapshot(states())
+                await loop.run_in_executor(None, self.write_snapshot, data)
+            elif self.pending:
+                lines, self.pending = self.pending, []
+                await loop.run_in_executor(None, self.write, lines)
+
+    def close(self, states):
+        """Write a final snapshot, after which the log isn't needed anymore."""
+        self.finish(self.take_snapshot(states))
+
+    def finish(self, data):
+        """close() with a snapshot already taken; can run in a thread."""
+        self.write_snapshot(data)
+        with self.lock:
+            self.log.close()
+            os.remove(self.log_path)
@@ -0,0 +1,170 @@
+"""
+A library of questions that games are put together from, instead of writing
+a whole game file for every game.
+"""
+
+import os
+import json
+import random
+import sqlite3
+import hashlib
+import contextlib
+
+# where the items of each part type are in a part
+LISTS = {
+    "connections": "questions",
+    "sequences": "questions",
+    "missing vowels": "groups",
+}
+# what a game put together from the library consists of
+LAYOUT = [("connections", 6), ("sequences", 6), ("missing vowels", 4)]
+
+
+def searchable(item):
+    """All text of a question or group that one might search for."""
+    texts = [item.get("answer"), item.get("explanation"), item.get("name")]
+    texts.extend(step.get("label") for step in item.get("steps", ()))
+    texts.extend(
+        phrase if isinstance(phrase, str) else phrase.get("answer")
+        for phrase in item.get("phrases", ())
+    )
+    return " ".join(str(text) for text in texts if text)
+
+
+class Library:
+    """
+    Questions and missing vowel groups, stored in SQLite. Every item has a
+    random sort key; sampling picks a random point and takes the unused items
+    following it, which the index on (kind, key) of unused items makes as fast
+    for millions of items as for a few.
+    """
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                hash TEXT NOT NULL UNIQUE,
+                data TEXT NOT NULL,
+                key INTEGER NOT NULL,
+                uses INTEGER NOT NULL DEFAULT 0,
+                last_used TEXT
+            );
+            CREATE INDEX IF NOT EXISTS unused ON items (kind, key) WHERE uses = 0;
+            CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5(text);
+            """)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def _add(self, kind, item):
+        if kind not in LISTS:
+            raise ValueError(f"Unknown kind: {kind}")
+        data = json.dumps(item, sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(f"{kind}\n{data}".encode()).hexdigest()
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO items (kind, hash, data, key) VALUES (?, ?, ?, ?)",
+            (kind, digest, data, random.getrandbits(63)),
+        )
+        if not cursor.rowcount:
+            return False
+        self.db.execute(
+            "INSERT INTO search (rowid, text) VALUES (?, ?)",
+            (cursor.lastrowid, searchable(item)),
+        )
+        return True
+
+    def add(self, kind, item):
+        """Add a question or group, unless it's there already."""
+        with self.transaction():
+            return self._add(kind, item)
+
+    def add_game(self, game_data):
+        """Add everything in a (validated) game; return how many items were new."""
+        with self.transaction():
+            return sum(
+                self._add(part_data["type"], item)
+                for part_data in game_data["parts"]
+                for item in part_data[LISTS[part_data["type"]]]
+            )
+
+    def count(self, kind=None, unused=False):
+        query = "SELECT count(*) FROM items WHERE kind = coalesce(?, kind)"
+        if unused:
+            query += " AND uses = 0"
+        return self.db.execute(query, (kind,)).fetchone()[0]
+
+    def search(self, text, limit=50):
+        """Items matching the full-text query text, best matches first."""
+        try:
+            rows = self.db.execute(
+                """
+                SELECT items.id, kind, data, uses FROM search
+                JOIN items ON items.id = search.rowid
+                WHERE search MATCH ? ORDER BY rank LIMIT ?
+                """,
+                (text, limit),
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search: {e}")
+        return [
+            {"id": item_id, "kind": kind, "item": json.loads(data), "uses": uses}
+            for item_id, kind, data, uses in rows
+        ]
+
+    def sample(self, kind, count):
+        """Up to count random unused items of that kind, as (id, item)."""
+        pivot = random.getrandbits(63)
+        query = """
+            SELECT id, data FROM items
+            WHERE kind = ? AND uses = 0 AND key {} ?
+            ORDER BY key LIMIT ?
+            """
+        rows = self.db.execute(query.format(">="), (kind, pivot, count)).fetchall()
+        if len(rows) < count:
+            # wrap around
+            rows += self.db.execute(
+                query.format("<"), (kind, pivot, count - len(rows))
+            ).fetchall()
+        return [(item_id, json.loads(data)) for item_id, data in rows]
+
+    def assemble(self, layout=LAYOUT):
+        """
+        Put together a game of unused items, and mark them as used. Raises
+        ValueError if there aren't enough.
+        """
+        parts = []
+        used = []
+        for kind, count in layout:
+            sampled = self.sample(kind, count)
+            if len(sampled) < count:
+                raise ValueError(
+                    f"Only {len(sampled)} unused {kind} items left, {count} needed"
+                )
+            used.extend(item_id for item_id, _ in sampled)
+            parts.append({"type": kind, LISTS[kind]: [item for _, item in sampled]})
+        with self.transaction():
+            self.db.executemany(
+                "UPDATE items SET uses = uses + 1, last_used = datetime('now')"
+                " WHERE id = ?",
+                [(item_id,) for item_id in used],
+            )
+        return {"parts": parts}
+
+
+def from_environment():
+    """lonelyconnect_library is the path of the library; without it, there is none."""
+    path = os.environ.get("lonelyconnect_library")
+    return Library(path) if path else None
+
+
+LIBRARY = from_environment()
@@ -3,6 +3,8 @@ from collections import Counter
 from typing import Literal, Optional
 from pydantic import BaseModel
 
+from .credentials import Credentials
+
 
 class BuzzState(Enum):
     inactive = "inactive"
@@ -26,7 +28,14 @@ class User(BaseModel):
         return self.name in ("left", "right")
 
     def get_token(self, tokens):
-        for token in tokens:
-            if tokens[token] == self.name:
-                return token
+        """
+        The user's latest token (or code) in a credentials.Credentials, which
+        knows them by user, or their first one in a plain dict.
+        """
+        if isinstance(tokens, Credentials):
+            token = tokens.newest(self.name)
+        else:
+            token = next((t for t, name in tokens.items() if name == self.name), None)
+        if token:
+            return token
         raise RuntimeError(f"Couldn't find token for user {self.name}")
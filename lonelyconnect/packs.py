@@ -0,0 +1,346 @@
+import os
+import json
+import mmap
+import fcntl
+import struct
+import asyncio
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import yaml
+
+# libyaml is a lot faster, if PyYAML was built with it
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def parse(raw):
+    try:
+        return yaml.load(raw, Loader=Loader)
+    except yaml.YAMLError as e:
+        raise ValueError(f"Not a valid game file: {e}")
+
+
+MAGIC = b"lonelyconnect pack 1\n"
+OFFSET = struct.Struct("<Q")
+
+
+def encode(game_data):
+    """
+    Compile a pack: a JSON header with everything except the lists in each part
+    (the questions, groups etc.), which follow it item by item, each encoded on
+    its own, with a table of where each item starts. That way, items can be
+    decoded one at a time.
+    """
+    items = []
+    parts = []
+    for part_data in game_data["parts"]:
+        part = {"data": {}, "lists": {}}
+        for key, value in part_data.items():
+            if isinstance(value, list):
+                part["lists"][key] = [len(items), len(value)]
+                items.extend(
+                    json.dumps(
+                        item, sort_keys=True, separators=(",", ":"), default=str
+                    ).encode()
+                    for item in value
+                )
+            else:
+                part["data"][key] = value
+        parts.append(part)
+    header = json.dumps(
+        {
+            "game": {key: value for key, value in game_data.items() if key != "parts"},
+            "parts": parts,
+            "items": len(items),
+        },
+        default=str,
+    ).encode()
+    offsets = [0]
+    for item in items:
+        offsets.append(offsets[-1] + len(item))
+    return b"".join(
+        [
+            MAGIC,
+            OFFSET.pack(len(header)),
+            header,
+            struct.pack(f"<{len(offsets)}Q", *offsets),
+            *items,
+        ]
+    )
+
+
+def digest_of(game_data):
+    """The hash a pack of game_data is known by."""
+    encoded = json.dumps(
+        game_data, sort_keys=True, separators=(",", ":"), default=str
+    ).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def build(raw, validate):
+    """Parse the game file raw and check it; the hash and the compiled pack."""
+    game_data = parse(raw)
+    validate(game_data)
+    return digest_of(game_data), encode(game_data)
+
+
+class Pack:
+    """
+    A compiled pack, in memory or memory-mapped. Looks like the game data it
+    was compiled from, except that the lists in parts are Items.
+    """
+
+    def __init__(self, digest, buffer):
+        self.digest = digest
+        self.buffer = buffer
+        if buffer[: len(MAGIC)] != MAGIC:
+            raise ValueError("Not a compiled pack")
+        (length,) = OFFSET.unpack_from(buffer, len(MAGIC))
+        start = len(MAGIC) + OFFSET.size
+        header = json.loads(buffer[start : start + length])
+        self.offsets_start = start + length
+        self.items_start = self.offsets_start + OFFSET.size * (header["items"] + 1)
+        self.data = {
+            **header["game"],
+            "parts": [
+                {
+                    **part["data"],
+                    **{
+                        key: Items(self, first, count)
+                        for key, (first, count) in part["lists"].items()
+                    },
+                }
+                for part in header["parts"]
+            ],
+        }
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def decode(self):
+        """All of the game data, as it was compiled."""
+        return {
+            **self.data,
+            "parts": [
+                {
+                    key: list(value) if isinstance(value, Items) else value
+                    for key, value in part_data.items()
+                }
+                for part_data in self.data["parts"]
+            ],
+        }
+
+    def raw_item(self, index):
+        start, end = struct.unpack_from(
+            "<2Q", self.buffer, self.offsets_start + OFFSET.size * index
+        )
+        return self.buffer[self.items_start + start : self.items_start + end]
+
+    def item(self, index):
+        return json.loads(self.raw_item(index))
+
+    def __reduce__(self):
+        # pickled games (e.g. by the SQLite backend) only refer to their pack
+        return _stored, (self.digest,)
+
+
+class Items(Sequence):
+    """A list in a part of a Pack, of which only used items are decoded."""
+
+    def __init__(self, pack, first, count):
+        self.pack = pack
+        self.first = first
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self.pack.item(self.first + index)
+
+    def key(self, index):
+        """Hash of the item's content, the same in every pack that has it."""
+        return hashlib.sha256(self.pack.raw_item(self.first + index)).digest()
+
+
+class PackStore:
+    """
+    Game packs by the hash of their content, so that a snapshot only needs to
+    name the pack its game was loaded from.
+
+    Packs are stored compiled (see encode()), which is much faster to load
+    than the YAML they were written in, and memory-mapped when read from
+    files. The hashes of the files they were compiled from are remembered too,
+    so that loading the same file again doesn't even need to parse it.
+
+    Game files can be compiled in several threads at once; a pack is only
+    added once it is complete.
+    """
+
+    def __init__(self):
+        self.packs = {}
+        self.sources = {}  # hash of the file -> hash of the pack
+        self.names = {}  # hash of the pack -> file name
+        self.directory = None
+        # for files and the index, written by whichever thread compiled a pack
+        self.lock = threading.RLock()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _write(self, name, data):
+        # named uniquely: other workers may be writing the same file right now
+        with self.lock:
+            descriptor, temporary = tempfile.mkstemp(
+                prefix=f"{name}.", suffix=".tmp", dir=self.directory
+            )
+            try:
+                with os.fdopen(descriptor, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temporary, self._path(name))
+            except BaseException:
+                os.unlink(temporary)
+                raise
+
+    def _save(self, digest):
+        if self.directory and not os.path.exists(self._path(f"{digest}.pack")):
+            self._write(f"{digest}.pack", self.packs[digest].buffer)
+
+    def _open(self, digest):
+        with open(self._path(f"{digest}.pack"), "rb") as f:
+            return Pack(digest, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _read_index(self):
+        # other processes (lonelyconnect compile) may have added packs
+        try:
+            with open(self._path("index.json")) as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return
+        self.sources.update(index["sources"])
+        self.names.update(index["names"])
+
+    def _save_index(self):
+        if self.directory:
+            # merged with what other workers wrote, by one worker at a time
+            with self.lock, open(self._path("index.lock"), "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                self._read_index()
+                index = {"sources": self.sources, "names": self.names}
+                self._write("index.json", json.dumps(index).encode())
+
+    def add(self, game_data, name=None):
+        digest = digest_of(game_data)
+        if digest not in self.packs:
+            self.packs[digest] = Pack(digest, encode(game_data))
+            self._save(digest)
+        if name:
+            self.names[digest] = name
+        return digest
+
+    def compile(self, raw, validate, name=None):
+        """
+        Parse the game file raw (YAML or JSON) and check it with validate(),
+        unless that was done before; return the hash of the pack.
+        """
+        return self.known(raw) or self.store(raw, *build(raw, validate), name)
+
+    async def compile_async(self, raw, validate, name=None):
+        """
+        compile(), without holding up the event loop: parsing happens in
+        another process (libyaml hardly ever lets other threads run), the
+        rest in a thread. The pack only becomes available once it's complete.
+        """
+        loop = asyncio.get_running_loop()
+        digest = await loop.run_in_executor(None, self.known, raw)
+        if digest:
+            return digest
+        try:
+            built = await loop.run_in_executor(parsers(), build, raw, validate)
+        except BrokenProcessPool:
+            stop_parsers()
+            raise ValueError("Not a valid game file: parsing it failed (too big?)")
+        return await loop.run_in_executor(None, self.store, raw, *built, name)
+
+    def known(self, raw):
+        """The hash of the pack compiled from the game file raw before, if any."""
+        source = hashlib.sha256(raw).hexdigest()
+        if source not in self.sources and self.directory:
+            self._read_index()
+        digest = self.sources.get(source)
+        if digest and digest in self:
+            return digest
+
+    def store(self, raw, digest, encoded, name=None):
+        """Keep the pack build() made of the game file raw; return its hash."""
+        if digest not in self.packs:
+            self.packs[digest] = Pack(digest, encoded)
+            self._save(digest)
+        if name:
+            self.names[digest] = name
+        self.sources[hashlib.sha256(raw).hexdigest()] = digest
+        self._save_index()
+        return digest
+
+    def __contains__(self, digest):
+        return digest in self.packs or bool(
+            self.directory and os.path.exists(self._path(f"{digest}.pack"))
+        )
+
+    def get(self, digest):
+        if digest not in self.packs and self.directory:
+            self.packs[digest] = self._open(digest)
+        return self.packs[digest]
+
+    def available(self):
+        """The packs that were compiled from files, with their file names."""
+        if self.directory:
+            self._read_index()
+        return dict(self.names)
+
+    def keep_in(self, directory):
+        """From now on, also store packs in directory, and look for them there."""
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        for digest in self.packs:
+            self._save(digest)
+        self._save_index()
+
+
+PACKS = PackStore()
+# processes for compile_async(), started when first needed
+PARSERS = None
+
+
+def parsers():
+    global PARSERS
+    if PARSERS is None:
+        PARSERS = ProcessPoolExecutor(
+            max_workers=int(os.environ.get("lonelyconnect_parsers", 2)),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return PARSERS
+
+
+def stop_parsers():
+    global PARSERS
+    if PARSERS is not None:
+        PARSERS.shutdown(wait=False, cancel_futures=True)
+        PARSERS = None
+
+
+def _stored(digest):
+    return PACKS.get(digest)
@@ -0,0 +1,188 @@
+"""
+Finding what blocks the event loop (and so delays everyone's buzzes) while it
+happens, without attaching anything from the outside.
+"""
+
+import os
+import sys
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+import threading
+from time import monotonic
+from collections import Counter
+
+from . import stats
+
+log = logging.getLogger(__name__)
+
+# milliseconds a request may take before we look at what it does; unset, we don't
+THRESHOLD = os.environ.get("lonelyconnect_profile")
+# milliseconds the event loop may be late before we look at what blocks it
+STALL = float(os.environ.get("lonelyconnect_stall", 100))
+# how many of the slowest requests and stalls are kept
+KEEP = int(os.environ.get("lonelyconnect_profile_keep", 20))
+
+
+def describe(frame, limit=40):
+    """The stack of frame, innermost first, as something to count."""
+    where = []
+    while frame and len(where) < limit:
+        code = frame.f_code
+        where.append(
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        )
+        frame = frame.f_back
+    return tuple(where)
+
+
+def runs_in(frame, outer):
+    """Whether frame is outer or was called by it, however indirectly."""
+    while frame:
+        if frame is outer:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class Profiler:
+    """
+    A thread of its own samples the stack of the event loop's thread while
+    the loop is late for watch() by more than stall, or while a request has
+    taken longer than threshold (both in seconds; None: requests aren't
+    sampled). The slowest of those are kept with what they were doing.
+
+    All requests share the loop's thread, so a request's samples are only
+    taken while the loop runs its task: time it spent waiting (for the loop,
+    or for a thread or process doing its work) shows in how long it took,
+    but not in its stacks.
+    """
+
+    def __init__(self, threshold=None, stall=0.1, keep=20, interval=0.01):
+        self.threshold = threshold
+        self.stall = stall
+        self.keep = keep
+        self.interval = interval
+        self.worst = []  # heap of (seconds, tie breaker, entry)
+        self.order = itertools.count()
+        # requests in progress: key -> (started, thread, the frame handling it,
+        # stack samples)
+        self.running = {}
+        self.beat = monotonic()  # when the loop last got to watch()
+        self.loop_thread = None
+        self.stall_samples = Counter()
+
+    def record(self, what, seconds, samples):
+        entry = {
+            "what": what,
+            "ms": round(seconds * 1000, 1),
+            "at": time.time(),
+            "samples": sum(samples.values()),
+            "stacks": [list(where) for where, _ in samples.most_common(3)],
+        }
+        heapq.heappush(self.worst, (seconds, next(self.order), entry))
+        if len(self.worst) > self.keep:
+            heapq.heappop(self.worst)
+
+    def report(self):
+        """The kept entries, slowest first."""
+        return [entry for *_, entry in sorted(self.worst, reverse=True)]
+
+    def sample(self, stopped):
+        while not stopped.wait(self.interval):
+            now = monotonic()
+            stalled = now - self.beat > self.stall
+            slow = []
+            if self.threshold is not None:
+                slow = [
+                    request
+                    for request in list(self.running.values())
+                    if now - request[0] > self.threshold
+                ]
+            if not stalled and not slow:
+                continue
+            frames = sys._current_frames()
+            if stalled and self.loop_thread in frames:
+                self.stall_samples[describe(frames[self.loop_thread])] += 1
+            for _started, thread, outer, samples in slow:
+                frame = frames.get(thread)
+                # not whichever other request the loop runs meanwhile
+                if runs_in(frame, outer):
+                    samples[describe(frame)] += 1
+
+    async def watch(self, interval=0.025):
+        """
+        Get back to the sampling thread every interval, noting the event
+        loop's lag, and keep what blocked it whenever it was too late.
+        """
+        self.loop_thread = threading.get_ident()
+        self.beat = monotonic()
+        stopped = threading.Event()
+        threading.Thread(target=self.sample, args=(stopped,), daemon=True).start()
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                now = monotonic()
+                lag = now - self.beat - interval
+                self.beat = now
+                stats.LOOP_LAG.observe(lag)
+                if lag > self.stall:
+                    samples, self.stall_samples = self.stall_samples, Counter()
+                    self.record("event loop", lag, samples)
+                    log.warning(
+                        "event loop blocked for %.0fms in %s",
+                        lag * 1000,
+                        max(samples, key=samples.get, default=("?",))[0],
+                    )
+        finally:
+            stopped.set()
+
+
+class Profiling:
+    """
+    ASGI middleware telling profiler about requests (up to the start of their
+    response), so that it samples and keeps those slower than its threshold.
+    """
+
+    def __init__(self, app, profiler=None):
+        self.app = app
+        self.profiler = profiler or PROFILER
+
+    async def __call__(self, scope, receive, send):
+        profiler = self.profiler
+        if scope["type"] != "http" or profiler.threshold is None:
+            await self.app(scope, receive, send)
+            return
+        key = object()
+        profiler.running[key] = (
+            monotonic(),
+            threading.get_ident(),
+            sys._getframe(),
+            Counter(),
+        )
+
+        def done():
+            started, _, _, samples = profiler.running.pop(key)
+            took = monotonic() - started
+            if took > profiler.threshold:
+                profiler.record(f"{scope['method']} {scope['path']}", took, samples)
+
+        async def profiled_send(message):
+            if message["type"] == "http.response.start" and key in profiler.running:
+                done()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, profiled_send)
+        finally:
+            if key in profiler.running:
+                done()
+
+
+PROFILER = Profiler(
+    threshold=THRESHOLD and float(THRESHOLD) / 1000,
+    stall=STALL / 1000,
+    keep=KEEP,
+)
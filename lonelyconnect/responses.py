@@ -0,0 +1,134 @@
+"""
+Turning responses into as few bytes as possible, as fast as possible: the
+stage is polled every second by every screen in the room.
+"""
+
+import os
+import json
+import gzip
+
+from fastapi.encoders import jsonable_encoder
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional, json does the same, only slower
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is good enough
+    brotli = None
+
+# bodies smaller than this aren't worth compressing
+MINIMUM_SIZE = int(os.environ.get("lonelyconnect_compress_minimum", 512))
+COMPRESSIBLE = ("text/", "application/json", "application/javascript")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Like JSONResponse, but with orjson if it is installed. Either way, only
+    what plain JSON can't express goes through FastAPI's (slow) encoder.
+    """
+
+    def render(self, content):
+        if orjson:
+            return orjson.dumps(
+                content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS
+            )
+        return json.dumps(
+            content,
+            default=jsonable_encoder,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode()
+
+
+def _brotli(body):
+    # quality 11 is for building assets ahead of time, far too slow per request
+    return brotli.compress(body, quality=5)
+
+
+def _gzip(body):
+    return gzip.compress(body, 6, mtime=0)
+
+
+# preferred first
+ENCODINGS = (("br", _brotli), ("gzip", _gzip)) if brotli else (("gzip", _gzip),)
+
+
+def negotiate(accept_encoding):
+    """The encoding to compress with for this Accept-Encoding, or None."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        encoding, _, parameters = part.partition(";")
+        quality = parameters.strip()
+        try:
+            accepted[encoding.strip()] = (
+                float(quality[2:]) if quality.startswith("q=") else 1
+            )
+        except ValueError:
+            continue
+    for encoding, _ in ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class Compression:
+    """
+    ASGI middleware compressing whole responses with the best encoding the
+    client accepts. Streams (Server-Sent Events, files) pass untouched: events
+    must arrive as they happen, and static files come precompressed.
+    """
+
+    def __init__(self, app, minimum_size=MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        encoding = scope["type"] == "http" and negotiate(
+            Headers(scope=scope).get("accept-encoding", "")
+        )
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+        compress = dict(ENCODINGS)[encoding]
+        start = None
+
+        async def compressing_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # held back until we know whether the body is all there is
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            etag = headers.get("etag")
+            if start["status"] == 304 and etag and not etag.startswith("W/"):
+                # as it was when it was sent compressed, see below
+                headers["ETag"] = f"W/{etag}"
+            elif (
+                not message.get("more_body")
+                and len(body) >= self.minimum_size
+                and "content-encoding" not in headers
+                and headers.get("content-type", "").startswith(COMPRESSIBLE)
+            ):
+                body = compress(body)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                if etag and not etag.startswith("W/"):
+                    # same content, different bytes
+                    headers["ETag"] = f"W/{etag}"
+                message = {**message, "body": body}
+            await send(start)
+            start = None
+            await send(message)
+
+        await self.app(scope, receive, compressing_send)
@@ -0,0 +1,317 @@
+import copy
+import asyncio
+import secrets
+from time import monotonic
+from collections import deque
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException
+
+from . import arbiter, backends, broadcast, credentials, game, snapshots, stats
+from .models import User
+
+DEFAULT_ID = "default"
+
+
+class View(NamedTuple):
+    """
+    Everything readers need of a room at one state_tag. Published by the room
+    and never changed afterwards, so that any number of readers can share it
+    while commands go on changing the game.
+    """
+
+    state_tag: str
+    stage: dict
+    actions: tuple
+    secrets: dict
+    buzzers: dict  # what each team's buzzer looks like
+    names: dict  # the teams' descriptive names
+    part: Optional[type]  # the class of the current part
+    published: float  # monotonic(), when the stage was taken
+
+    @classmethod
+    def of(cls, room):
+        game = room.game
+        stage, actions, secrets = copy.deepcopy(
+            (game.stage(), game.actions(), game.secrets())
+        )
+        return cls(
+            state_tag=game.state_tag,
+            stage=stage,
+            actions=tuple(tuple(action) for action in actions),
+            secrets=secrets,
+            buzzers={who: game.buzzer_state(who) for who in ("left", "right")},
+            names={name: user.descriptive_name for name, user in room.users.items()},
+            part=type(game.part) if game.part else None,
+            published=monotonic(),
+        )
+
+    def timer(self):
+        """The stage's timer, with what it has left by now rather than then."""
+        timer = {key: self.stage[key] for key in game.NO_TIMER if key in self.stage}
+        if timer.get("time_remaining"):
+            left = timer["time_remaining"] - (monotonic() - self.published)
+            timer["time_remaining"] = round(max(left, 0), 3)
+        return timer
+
+
+class Room:
+    """One show: its game, its users and everything needed to join it."""
+
+    __slots__ = (
+        "id",
+        "_game",
+        "users",
+        "tokens",
+        "codes",
+        "revoked",
+        "changes",
+        "arbiter",
+        "stored_version",
+        "_view",
+        "_queue",
+        "_writer",
+        "_expiry",
+    )
+
+    def __init__(self, id, changes=None):
+        self.id = id
+        self._game = game.Game()
+        self.users = {name: User(name=name) for name in ("admin", "left", "right")}
+        self.tokens = credentials.tokens()
+        self.codes = credentials.codes()
+        self.revoked = credentials.revoked()
+        self.changes = changes or broadcast.Broadcast()
+        self.arbiter = arbiter.Arbiter(self.decide_buzzes)
+        self.stored_version = None  # which version of the room BACKEND has
+        self._view = None
+        self._queue = None  # commands waiting for the writer
+        self._writer = None  # the writer's task, while it runs
+        self._expiry = None  # when the "expire" command gets queued
+
+    @property
+    def game(self):
+        return self._game
+
+    @game.setter
+    def game(self, value):
+        self._game = value
+
+    @property
+    def prefix(self):
+        """What all URLs of this room start with."""
+        return f"/rooms/{self.id}"
+
+    @property
+    def state(self):
+        """Everything that commands can change."""
+        return self.game, self.users, self.tokens, self.codes, self.revoked
+
+    @state.setter
+    def state(self, value):
+        self.game, users, tokens, codes, revoked = value
+        # this state was versioned by someone else
+        self.game.touch()
+        # the default room's dicts are also known as auth.USERS etc.
+        for mine, theirs in (
+            (self.users, users),
+            (self.tokens, tokens),
+            (self.codes, codes),
+            (self.revoked, revoked),
+        ):
+            mine.clear()
+            mine.update(theirs)
+        self.schedule_expiry()
+
+    @property
+    def view(self):
+        """The current View of this room; readers use it instead of the game."""
+        view = self._view
+        # the timer, or someone replacing the game, changes the state too
+        if view is None or view.state_tag != self.game.state_tag:
+            view = self._view = View.of(self)
+        return view
+
+    def execute(self, command, *args):
+        """
+        Run one of commands.COMMANDS on this room right away and tell everyone.
+        While serving requests, commands are submit()ted instead.
+        """
+        result = self._run(command, args)
+        self.changes.notify()
+        return result
+
+    def _run(self, command, args):
+        if JOURNAL:
+            JOURNAL.append(self.id, command, args)
+        return BACKEND.execute(self, command, args)
+
+    def _enqueue(self, future, command, *args):
+        # created lazily, idle rooms shouldn't cost anything
+        if self._queue is None:
+            self._queue = deque()
+        self._queue.append((command, args, future, monotonic()))
+        if len(self._queue) == 1:
+            self._writer = future.get_loop().create_task(self._write())
+
+    async def _write(self):
+        """
+        The room's single writer: run the queued commands one after the other,
+        then publish the View that they lead to and tell everyone. Only a
+        shared BACKEND makes it wait (for other workers); everything else goes
+        on meanwhile.
+        """
+        changed = False
+        while self._queue:
+            command, args, future, queued = self._queue[0]
+            stats.COMMAND_WAIT.labels(command).observe(monotonic() - queued)
+            try:
+                if JOURNAL:
+                    JOURNAL.append(self.id, command, args)
+                result = await BACKEND.run(self, command, args)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                changed = True
+                if not future.done():
+                    future.set_result(result)
+            self._queue.popleft()
+        self._writer = None
+        if changed:
+            self._view = View.of(self)
+            self.changes.notify()
+            self.schedule_expiry()
+
+    async def submit(self, command, *args):
+        """
+        Queue one of commands.COMMANDS behind everything submitted to this
+        room before, and return its result once the writer ran it.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(future, command, *args)
+        return await future
+
+    def schedule_expiry(self):
+        """
+        Have the writer run the "expire" command right when the timer runs
+        out, behind everything that came in before.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # not serving yet, startup() calls this again
+        self.cancel_expiry()
+        timer = self.game.timer
+        if timer and timer.remaining and not timer.frozen:
+            self._expiry = loop.call_later(timer.remaining, self._expire)
+
+    def cancel_expiry(self):
+        if self._expiry:
+            self._expiry.cancel()
+            self._expiry = None
+
+    def _expire(self):
+        self._expiry = None
+        self._enqueue(asyncio.get_running_loop().create_future(), "expire")
+
+    async def decide_buzzes(self, batch):
+        """Give the buzz to the first in the batch that may have it."""
+        # queued all at once, so that no other command gets in between
+        for _pressed_at, who, future in batch:
+            self._enqueue(future, "buzz", who)
+
+
+class DefaultRoom(Room):
+    """
+    The room used when no room is given; its game is game.GAME, so that single
+    show setups (and their swap files) keep working as before.
+    """
+
+    __slots__ = ()
+
+    @property
+    def game(self):
+        return game.GAME
+
+    @game.setter
+    def game(self, value):
+        game.GAME = value
+
+    @property
+    def prefix(self):
+        return ""
+
+
+BACKEND = backends.from_environment()
+# the journal.Journal recording all commands, if startup() opened one
+JOURNAL = None
+DEFAULT = DefaultRoom(DEFAULT_ID, changes=broadcast.CHANGES)
+ROOMS = {DEFAULT_ID: DEFAULT}
+
+
+def create():
+    room = Room(secrets.token_urlsafe(6))
+    BACKEND.add(room)
+    ROOMS[room.id] = room
+    if JOURNAL:
+        JOURNAL.append(room.id, "create", ())
+    return room
+
+
+def delete(room_id):
+    if room_id == DEFAULT_ID or not get_or_none(room_id):
+        raise KeyError(room_id)
+    ROOMS.pop(room_id).cancel_expiry()
+    BACKEND.remove(room_id)
+    if JOURNAL:
+        JOURNAL.append(room_id, "delete", ())
+
+
+def get_or_none(room_id):
+    room = ROOMS.get(room_id)
+    if not room:
+        # maybe another worker created it
+        room = BACKEND.fetch(room_id, Room)
+        if room:
+            ROOMS[room_id] = room
+    return room
+
+
+async def get(room_id: str = DEFAULT_ID):
+    # async, so that FastAPI runs it on the event loop (whose thread the
+    # BACKEND's connection belongs to) instead of in its threadpool; fetching
+    # a room only reads, which never waits for writers in SQLite's WAL mode
+    room = get_or_none(room_id)
+    if not room:
+        raise HTTPException(status_code=404, detail="No such room")
+    return room
+
+
+def schedule_expiries():
+    for room in ROOMS.values():
+        room.schedule_expiry()
+
+
+async def watch():
+    await BACKEND.watch(ROOMS, keep=DEFAULT_ID)
+
+
+def snapshot():
+    return {room_id: snapshots.dump(room) for room_id, room in ROOMS.items()}
+
+
+def restore(states):
+    """Bring back the rooms from a snapshot()."""
+    for room_id, state in states.items():
+        snapshots.restore(ROOMS.setdefault(room_id, Room(room_id)), state)
+
+
+def replay(room_id, command, args):
+    """Apply a journal entry again, without recording it again."""
+    if command == "create":
+        ROOMS[room_id] = Room(room_id)
+    elif command == "delete":
+        ROOMS.pop(room_id, None)
+    else:
+        BACKEND.execute(ROOMS[room_id], command, args)
@@ -1,66 +1,233 @@
+import secrets
+from time import monotonic
+
 import markupsafe
 
-from fastapi import FastAPI, Depends, Request
+from fastapi import APIRouter, Depends, Request
 from fastapi.templating import Jinja2Templates
+from starlette.responses import HTMLResponse, StreamingResponse
 
-from . import auth, game
+from . import assets, auth, cache, game, library, packs, profiler, rooms, stats
 from .models import User
 
 
-subapp = FastAPI()
+router = APIRouter()
 
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["static"] = assets.ASSETS.url
+
+KEEPALIVE = 15  # seconds between SSE comments, so dead connections get noticed
+# the requests of stages connected for Server-Sent Events right now
+STAGE_STREAMS = set()
+# rendered in place of the viewer's token, which goes in afterwards, so that
+# everyone in the same role shares renders instead of every login its own
+TOKEN = f"token-{secrets.token_hex(8)}"
+
+
+def render(room, view, page, viewer, make_context, token=None):
+    """
+    Render the template and context returned by make_context(), or reuse what
+    was rendered for the same room, page, view and viewer before. Where the
+    context has TOKEN, the page gets token.
+    """
+
+    def do_render():
+        start = monotonic()
+        template, context = make_context()
+        html = templates.get_template(template).render(
+            {"prefix": room.prefix, **context}
+        )
+        stats.RENDERS.labels(template).observe(monotonic() - start)
+        return html
+
+    html = cache.RENDERS.get((room.id, page, view.state_tag, viewer), do_render)
+    # rendered with what the timer had left back then; clients count down
+    # from when they get it, so they need to know what's left by now
+    left = view.stage.get("time_remaining")
+    if left:
+        now = view.timer()["time_remaining"]
+        html = html.replace(f'data-remaining="{left}"', f'data-remaining="{now}"')
+    if token:
+        html = html.replace(TOKEN, markupsafe.escape(token))
+    return html
 
 
-@subapp.get("/stage")
-async def ui_stage(request: Request):
-    stage = game.GAME.stage()
+def stage_context(request, view, **extra):
+    """Pick the stage template and the values to render it with."""
     base_dict = {
         "request": request,
-        "leftname": auth.USERS["left"].descriptive_name or "left",
-        "rightname": auth.USERS["right"].descriptive_name or "right",
-        "leftscore": game.GAME.points["left"],
-        "rightscore": game.GAME.points["right"],
-        **stage,
+        "leftname": view.names["left"] or "left",
+        "rightname": view.names["right"] or "right",
+        "leftscore": view.stage["points"]["left"],
+        "rightscore": view.stage["points"]["right"],
+        **view.stage,
+        **extra,
     }
 
-    if game.GAME.part and isinstance(
-        game.GAME.part, (game.Connections, game.Sequences)
-    ):
-        return templates.TemplateResponse(
-            "connections.html",
-            base_dict,
-        )
-    elif game.GAME.part and isinstance(game.GAME.part, game.MissingVowels):
-        return templates.TemplateResponse(
-            "missing_vowels.html",
-            base_dict,
-        )
+    if view.part and issubclass(view.part, (game.Connections, game.Sequences)):
+        return "connections.html", base_dict
+    elif view.part and issubclass(view.part, game.MissingVowels):
+        return "missing_vowels.html", base_dict
     else:
-        return templates.TemplateResponse(
-            "stage.html",
-            base_dict,
-        )
+        return "stage.html", base_dict
+
+
+@router.get("/stage")
+async def ui_stage(
+    request: Request, poll: bool = False, room: rooms.Room = Depends(rooms.get)
+):
+    if poll:
+        # streams are counted in STAGE_STREAMS; polls by address
+        stats.ACTIVE.seen("stage", request.client and request.client.host)
+    view = room.view
+    return cache.conditional(
+        request,
+        view,
+        lambda: HTMLResponse(
+            render(
+                room,
+                view,
+                "stage",
+                poll,
+                lambda: stage_context(request, view, poll=poll),
+            )
+        ),
+    )
+
+
+def sse_message(event, data):
+    lines = "".join(f"data: {line}\n" for line in data.splitlines())
+    return f"event: {event}\n{lines}\n"
+
+
+async def stage_events(request, room):
+    """Yield a fresh stage fragment whenever the state changed."""
+    last = None
+    STAGE_STREAMS.add(request)
+    try:
+        while not await request.is_disconnected():
+            seen = room.changes.count
+            view = room.view
+            if view.state_tag != last:
+                last = view.state_tag
+                body = render(
+                    room,
+                    view,
+                    "stage fragment",
+                    None,
+                    lambda: stage_context(request, view, fragment=True),
+                )
+                yield sse_message("stage", body)
+            if not await room.changes.wait(seen, KEEPALIVE):
+                yield ": keepalive\n\n"
+    finally:
+        STAGE_STREAMS.discard(request)
+
+
+@router.get("/stage/events")
+async def ui_stage_events(request: Request, room: rooms.Room = Depends(rooms.get)):
+    return StreamingResponse(
+        stage_events(request, room),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+def buzzer_context(request, view, user, token):
+    return "buzzer.html", {
+        "request": request,
+        "disabled": ""
+        if view.stage["buzz_state"] in ("active", "left", "right")
+        else "disabled",  # user.name) else "disabled",
+        "buzz_state": view.buzzers[user.name],
+        **view.stage,
+        "token": token,
+        "authheader": markupsafe.Markup(
+            f""" hx-headers='{{"Authorization": "Bearer {token}"}}' """
+        ),
+    }
 
 
-@subapp.get("/buzzer")
-async def ui_buzzer(request: Request, user: User = Depends(auth.player)):
-    token = user.get_token(auth.TOKENS)
+@router.get("/buzzer")
+async def ui_buzzer(
+    request: Request,
+    user: User = Depends(auth.player),
+    token: str = Depends(auth.oauth2_scheme),
+    room: rooms.Room = Depends(rooms.get),
+):
+    view = room.view
+    return cache.conditional(
+        request,
+        view,
+        lambda: HTMLResponse(
+            render(
+                room,
+                view,
+                "buzzer",
+                user.name,
+                lambda: buzzer_context(request, view, user, TOKEN),
+                token,
+            )
+        ),
+    )
+
+
+def admin_context(request, view, token, server):
+    return "admin.html", {
+        "request": request,
+        "actions": view.actions,
+        "authheader": markupsafe.Markup(
+            f""" hx-headers='{{"Authorization": "Bearer {token}"}}' """
+        ),
+        "secrets": view.secrets,
+        "library": library.LIBRARY is not None,
+        # only the server's admin sees what was slow, in all rooms
+        "server": server,
+        **view.stage,
+    }
+
+
+@router.get("/admin")
+async def ui_admin(
+    request: Request,
+    user: User = Depends(auth.admin),
+    token: str = Depends(auth.oauth2_scheme),
+    room: rooms.Room = Depends(rooms.get),
+):
+    view = room.view
+    return cache.conditional(
+        request,
+        view,
+        lambda: HTMLResponse(
+            render(
+                room,
+                view,
+                "admin",
+                "admin",
+                lambda: admin_context(request, view, TOKEN, room is rooms.DEFAULT),
+                token,
+            )
+        ),
+    )
+
+
+@router.get("/packs")
+async def ui_packs(
+    request: Request,
+    user: User = Depends(auth.admin),
+    token: str = Depends(auth.oauth2_scheme),
+    room: rooms.Room = Depends(rooms.get),
+):
+    """
+    Buttons loading the compiled packs. Not part of the admin page, whose
+    renders only change with the game, while packs get compiled any time.
+    """
     return templates.TemplateResponse(
-        "buzzer.html",
+        "packs.html",
         {
             "request": request,
-            "disabled": ""
-            if game.GAME.buzz_state in ("active", "left", "right")
-            else "disabled",  # user.name) else "disabled",
-            "buzz_state": (
-                "buzzed"
-                if game.GAME.buzz_state == user.name
-                else "buzzable"
-                if game.GAME.buzz_state in ("active", f"active-{user.name}")
-                else "inactive"
-            ),
-            **game.GAME.stage(),
+            "prefix": room.prefix,
+            "packs": packs.PACKS.available(),
             "authheader": markupsafe.Markup(
                 f""" hx-headers='{{"Authorization": "Bearer {token}"}}' """
             ),
@@ -68,41 +235,40 @@ async def ui_buzzer(request: Request, user: User = Depends(auth.player)):
     )
 
 
-@subapp.get("/admin")
-async def ui_admin(request: Request, user: User = Depends(auth.admin)):
-    token = user.get_token(auth.TOKENS)
+@router.get("/profile")
+async def ui_profile(request: Request, user: User = Depends(auth.server_admin)):
+    """The slowest requests and event loop stalls, with what they were doing."""
     return templates.TemplateResponse(
-        "admin.html",
+        "profile.html",
         {
             "request": request,
-            "actions": game.GAME.actions(),
-            "authheader": markupsafe.Markup(
-                f""" hx-headers='{{"Authorization": "Bearer {token}"}}' """
-            ),
-            "secrets": game.GAME.secrets(),
-            **game.GAME.stage(),
+            "entries": profiler.PROFILER.report(),
+            "threshold": profiler.PROFILER.threshold,
+            "stall": profiler.PROFILER.stall,
         },
     )
 
 
-@subapp.get("/login")
-async def ui_login(request: Request):
+@router.get("/login")
+async def ui_login(request: Request, room: rooms.Room = Depends(rooms.get)):
     return templates.TemplateResponse(
         "login.html",
         {
             "request": request,
+            "prefix": room.prefix,
         },
     )
 
 
-@subapp.post("/redirect")
-async def redirect(request: Request):
+@router.post("/redirect")
+async def redirect(request: Request, room: rooms.Room = Depends(rooms.get)):
     form_data = await request.form()
-    user = auth.logged_in(form_data.get("access_token"))
+    user = auth.logged_in(form_data.get("access_token"), room)
     return templates.TemplateResponse(
         "redirect.html",
         {
             "request": request,
+            "prefix": room.prefix,
             "authheader": markupsafe.Markup(
                 f""" hx-headers='{{"Authorization": "Bearer {form_data["access_token"]}"}}' """
             ),
@@ -0,0 +1,78 @@
+"""
+Which questions the teams of a league have seen before, so that their next
+games don't repeat them.
+"""
+
+import os
+import re
+import tempfile
+import threading
+
+
+class BloomFilter:
+    """
+    A set of item keys (see packs.Items.key) that never grows: 128KB hold
+    tens of thousands of keys (decades of weekly games) with practically no
+    false positives. A false positive only means a question is skipped.
+    """
+
+    BITS = 2**20
+    HASHES = 7
+
+    def __init__(self, bits=None):
+        self.bits = bits or bytearray(self.BITS // 8)
+
+    def _positions(self, key):
+        # keys are hashes already, their parts are as good as separate hashes
+        first = int.from_bytes(key[:8], "little")
+        step = int.from_bytes(key[8:16], "little") | 1
+        return ((first + i * step) % self.BITS for i in range(self.HASHES))
+
+    def __contains__(self, key):
+        return all(self.bits[bit // 8] & (1 << bit % 8) for bit in self._positions(key))
+
+    def add(self, key):
+        for bit in self._positions(key):
+            self.bits[bit // 8] |= 1 << bit % 8
+
+
+class SeenStore:
+    """A BloomFilter per league, stored in a directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.leagues = {}
+        # loads for the same league may get and record in threads at once
+        self.lock = threading.RLock()
+
+    def _path(self, league):
+        if not re.fullmatch(r"[\w-]{1,64}", league):
+            raise ValueError("League names can only have letters, digits, _ and -")
+        return os.path.join(self.directory, f"{league}.bloom")
+
+    def get(self, league):
+        with self.lock:
+            if league not in self.leagues:
+                try:
+                    with open(self._path(league), "rb") as f:
+                        self.leagues[league] = BloomFilter(bytearray(f.read()))
+                except FileNotFoundError:
+                    self.leagues[league] = BloomFilter()
+            return self.leagues[league]
+
+    def record(self, league, keys):
+        with self.lock:
+            seen = self.get(league)
+            for key in keys:
+                seen.add(key)
+            os.makedirs(self.directory, exist_ok=True)
+            # named uniquely: other workers may record the same league
+            descriptor, temporary = tempfile.mkstemp(
+                prefix=f"{league}.", suffix=".tmp", dir=self.directory
+            )
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(seen.bits)
+            os.replace(temporary, self._path(league))
+
+
+SEEN = SeenStore(os.environ.get("lonelyconnect_seen", "seen"))
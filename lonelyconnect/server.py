@@ -0,0 +1,560 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import warnings
+import itertools
+from time import monotonic
+
+# starlette's use of Jinja2 causes a warning
+warnings.filterwarnings(
+    action="ignore", category=DeprecationWarning, module=r".*starlette"
+)
+
+import uvicorn
+
+from fastapi import (
+    FastAPI,
+    APIRouter,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    File,
+    Form,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.security import OAuth2PasswordRequestForm
+
+from starlette.responses import PlainTextResponse, RedirectResponse
+
+from . import (
+    arbiter,
+    assets,
+    auth,
+    cache,
+    credentials,
+    game,
+    journal,
+    library,
+    packs,
+    profiler,
+    responses,
+    rooms,
+    route_ui,
+    seen,
+    stats,
+)
+from .models import User, BuzzState
+from .route_ui import router as ui_routes
+
+app = FastAPI()
+app.add_middleware(responses.Compression)
+app.add_middleware(stats.Timing)
+app.add_middleware(profiler.Profiling)
+app.mount("/static", assets.ASSETS, name="static")
+# everything exists once for the default room, and once per room
+router = APIRouter()
+# background tasks keeping our rooms up to date with other workers, or
+# writing the journal
+WATCHERS = set()
+
+
+def compile_packs(paths):
+    """Compile game files ahead of time, so that loading them is instant."""
+    packs.PACKS.keep_in(os.environ.get("lonelyconnect_packs", "packs"))
+    failed = False
+    for path in paths:
+        with open(path, "rb") as f:
+            raw = f.read()
+        try:
+            digest = packs.PACKS.compile(raw, game.validate, os.path.basename(path))
+        except ValueError as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            failed = True
+        else:
+            print(f"{path}: {digest}")
+    return 1 if failed else 0
+
+
+def import_packs(paths):
+    """Add the questions of game files to the library."""
+    if not library.LIBRARY:
+        return "Set lonelyconnect_library to the library to import into"
+    failed = False
+    for path in paths:
+        with open(path, "rb") as f:
+            raw = f.read()
+        try:
+            game_data = packs.parse(raw)
+            game.validate(game_data)
+        except ValueError as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            failed = True
+        else:
+            print(f"{path}: {library.LIBRARY.add_game(game_data)} new items")
+    return 1 if failed else 0
+
+
+def build_assets():
+    """Prepare static/ to be served compressed and cached, see assets.Assets."""
+    target = os.environ.get("lonelyconnect_assets", "assets")
+    for name, hashed in assets.build("static", target).items():
+        print(f"{name}: {os.path.join(target, hashed)}")
+    return 0
+
+
+def entrypoint():
+    if sys.argv[1:2] == ["compile"]:
+        sys.exit(compile_packs(sys.argv[2:]))
+    if sys.argv[1:2] == ["import"]:
+        sys.exit(import_packs(sys.argv[2:]))
+    if sys.argv[1:2] == ["assets"]:
+        sys.exit(build_assets())
+    workers = int(os.environ.get("lonelyconnect_workers", 1))
+    if workers > 1 and not rooms.BACKEND.shared:
+        sys.exit("Several workers need a shared backend, see lonelyconnect_backend")
+    return uvicorn.run(
+        "lonelyconnect:app",
+        host="0.0.0.0",
+        port=8000,
+        log_level="info",
+        workers=workers,
+    )
+
+
+@router.get("/")
+async def index(room: rooms.Room = Depends(rooms.get)):
+    return RedirectResponse(f"{room.prefix}/ui/login")
+
+
+@router.post("/login")
+async def login(
+    response: Response,
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    room: rooms.Room = Depends(rooms.get),
+):
+    # username is actually ignored. These are random single-use non-critical codes.
+    code, now = form_data.password.upper(), time.time()
+    if credentials.SECRET:
+        username = await room.submit("login", code, None, now)
+        token = credentials.sign(username, room.id, now + credentials.TOKEN_TTL)
+    else:
+        token = random_token(32)
+        username = await room.submit("login", code, token, now)
+    if not username:
+        raise HTTPException(
+            status_code=401,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if request.headers.get("HX-Request"):
+        response.headers["HX-Trigger-After-Settle"] = "ocResponse"
+    return {"access_token": token, "token_type": "bearer"}
+
+
+@router.post("/logout")
+async def logout(
+    token: str = Depends(auth.oauth2_scheme),
+    user: User = Depends(auth.logged_in),
+    room: rooms.Room = Depends(rooms.get),
+):
+    await room.submit("logout", token)
+
+
+def random_token(length=6):
+    return "".join(random.choices("ABCDEFGHKLMNPQRSTUVWXYZ23456789", k=length))
+
+
+@app.on_event("startup")
+async def startup():
+    if rooms.BACKEND.shared or not os.environ.get("lonelyconnect_no_swap"):
+        # snapshots and the states other workers store only refer to packs, so
+        # they need to be kept where everyone finds them; and packs compiled
+        # ahead of time can be found there
+        packs.PACKS.keep_in(os.environ.get("lonelyconnect_packs", "packs"))
+    if rooms.BACKEND.shared:
+        # the backend keeps everything, no need for a journal
+        WATCHERS.add(asyncio.create_task(rooms.watch()))
+    elif not os.environ.get("lonelyconnect_no_swap"):
+        rooms.JOURNAL = journal.Journal("swap.bin", "swap.log")
+        # reading and decoding a big snapshot happens off the event loop
+        found = await asyncio.get_running_loop().run_in_executor(
+            None, rooms.JOURNAL.read
+        )
+        rooms.JOURNAL.resume(rooms.restore, rooms.replay, *found)
+        WATCHERS.add(asyncio.create_task(rooms.JOURNAL.run(rooms.snapshot)))
+    # restored timers keep running
+    rooms.schedule_expiries()
+    WATCHERS.add(asyncio.create_task(profiler.PROFILER.watch()))
+    if "lonelyconnect_admin_code" in os.environ:
+        code = os.environ["lonelyconnect_admin_code"]
+    else:
+        code = random_token(6)
+        print("admin code:", code)
+    rooms.DEFAULT.execute("pair", code, "admin", time.time())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    while WATCHERS:
+        WATCHERS.pop().cancel()
+    packs.stop_parsers()
+    for room in rooms.ROOMS.values():
+        room.cancel_expiry()
+    if rooms.JOURNAL:
+        data = rooms.JOURNAL.take_snapshot(rooms.snapshot())
+        await asyncio.get_running_loop().run_in_executor(
+            None, rooms.JOURNAL.finish, data
+        )
+        rooms.JOURNAL = None
+
+
+@router.post("/pair/{username}")
+async def pair(
+    username: str,
+    user: User = Depends(auth.admin),
+    room: rooms.Room = Depends(rooms.get),
+):
+    code = random_token(6)
+    await room.submit("pair", code, username, time.time())
+    return code
+
+
+async def load_pack(room, pack, league=None):
+    """Load the pack, avoiding questions the league has seen before."""
+    seed = random.getrandbits(32)
+    # reading and writing what the league has seen, and choosing among the
+    # items of a big pack, happen in threads; buzzers and stages don't wait
+    loop = asyncio.get_running_loop()
+    try:
+        seen_before = (
+            await loop.run_in_executor(None, seen.SEEN.get, league) if league else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    # the command gets told the choice, so that replaying it depends neither
+    # on what has been seen by then nor on how a later version would choose
+    choices, keys = await loop.run_in_executor(
+        None, game.choose, pack, seed, seen_before
+    )
+    await room.submit("load", pack, seed, choices)
+    if league:
+        await loop.run_in_executor(None, seen.SEEN.record, league, keys)
+
+
+@router.post("/load")
+async def load(
+    user: User = Depends(auth.admin),
+    file: bytes = File(...),
+    league: str = Form(None),
+    room: rooms.Room = Depends(rooms.get),
+):
+    try:
+        # parsing a big game file takes a while, buzzers and stages don't wait
+        # for it; the game is replaced once it's done
+        pack = await packs.PACKS.compile_async(file, game.validate)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    await load_pack(room, pack, league)
+
+
+@router.post("/load/{pack}")
+async def load_compiled(
+    pack: str,
+    user: User = Depends(auth.admin),
+    league: str = Form(None),
+    room: rooms.Room = Depends(rooms.get),
+):
+    if pack not in packs.PACKS:
+        raise HTTPException(status_code=404, detail="No such pack")
+    await load_pack(room, pack, league)
+
+
+@router.get("/packs")
+async def list_packs(user: User = Depends(auth.admin)):
+    return packs.PACKS.available()
+
+
+def get_library():
+    if not library.LIBRARY:
+        raise HTTPException(status_code=404, detail="No library configured")
+    return library.LIBRARY
+
+
+@router.post("/library/game")
+async def load_from_library(
+    user: User = Depends(auth.admin),
+    room: rooms.Room = Depends(rooms.get),
+    lib: library.Library = Depends(get_library),
+):
+    try:
+        game_data = lib.assemble()
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    await load_pack(room, packs.PACKS.add(game_data))
+
+
+@router.get("/library/search")
+async def search_library(
+    q: str,
+    user: User = Depends(auth.admin),
+    lib: library.Library = Depends(get_library),
+):
+    try:
+        return lib.search(q)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.get("/codes")
+async def codes(
+    user: User = Depends(auth.admin), room: rooms.Room = Depends(rooms.get)
+):
+    return responses.FastJSONResponse(dict(room.codes))
+
+
+@router.get("/stage")
+async def stage(request: Request, room: rooms.Room = Depends(rooms.get)):
+    view = room.view
+    return cache.conditional(request, view, lambda: {**view.stage, **view.timer()})
+
+
+@router.get("/secrets")
+async def secrets(
+    request: Request,
+    user: User = Depends(auth.admin),
+    room: rooms.Room = Depends(rooms.get),
+):
+    view = room.view
+    return cache.conditional(request, view, lambda: view.secrets)
+
+
+@router.get("/actions")
+async def state(
+    request: Request,
+    user: User = Depends(auth.admin),
+    room: rooms.Room = Depends(rooms.get),
+):
+    view = room.view
+    return cache.conditional(request, view, lambda: view.actions)
+
+
+@router.post("/action/{key}")
+async def state(
+    key: str,
+    user: User = Depends(auth.admin),
+    room: rooms.Room = Depends(rooms.get),
+):
+    return await room.submit("action", key)
+
+
+async def try_buzz(room, user, pressed_at=None):
+    received = monotonic()
+    try:
+        return await room.arbiter.submit(user.name, pressed_at or received)
+    finally:
+        # the writer published the outcome before we got here
+        stats.BUZZ_VISIBLE.observe(monotonic() - received)
+
+
+@router.post("/buzz")
+async def buzz(
+    user: User = Depends(auth.player), room: rooms.Room = Depends(rooms.get)
+):
+    try:
+        return await try_buzz(room, user)
+    except PermissionError:
+        raise HTTPException(
+            status_code=409,
+            detail="Can't buzz right now",
+        )
+
+
+async def push_buzzer_state(websocket, room, user):
+    """Send the buzzer state whenever it changes."""
+    last = None
+    while True:
+        seen = room.changes.count
+        view = room.view
+        state = {
+            "type": "state",
+            "buzz_state": view.buzzers[user.name],
+            **{key: view.stage.get(key) for key in game.NO_TIMER},
+        }
+        if state != last:
+            last = state
+            await websocket.send_json({**state, **view.timer()})
+        await room.changes.wait(seen)
+
+
+async def sync_clock(websocket):
+    """Ping a few times in quick succession, then now and then to track drift."""
+    for i in itertools.count():
+        await websocket.send_json({"type": "ping", "server": monotonic()})
+        await asyncio.sleep(0.2 if i < 5 else 10)
+
+
+AUTH_TIMEOUT = 10  # seconds a buzzer has to send its token
+
+
+async def receive_token(websocket):
+    """
+    The token of the {"type": "auth", "token": ...} frame a buzzer sends
+    first, or None. It isn't part of the URL, which would put it in the
+    access logs of every server and proxy on the way.
+    """
+    try:
+        message = await asyncio.wait_for(websocket.receive_json(), AUTH_TIMEOUT)
+    except (asyncio.TimeoutError, ValueError):
+        return None
+    if isinstance(message, dict) and message.get("type") == "auth":
+        token = message.get("token")
+        return token if isinstance(token, str) else None
+    return None
+
+
+@router.websocket("/buzz/ws")
+async def buzz_socket(websocket: WebSocket, room_id: str = rooms.DEFAULT_ID):
+    """
+    Persistent connection for a buzzer: after authenticating with its first
+    frame, it sends {"type": "buzz"} frames and gets told about every change
+    of its buzz state. It also answers our pings, so that its buzzes can be
+    ordered by when they were pressed.
+    """
+    await websocket.accept()
+    try:
+        token = await receive_token(websocket)
+    except WebSocketDisconnect:
+        return
+    room = rooms.get_or_none(room_id)
+    user = room and token and room.users.get(auth.username(token, room))
+    if not user or not user.is_player:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    stats.ACTIVE.seen("player", (room.id, user.name))
+    clock = room.arbiter.clocks[user.name] = arbiter.ClockSync()
+    tasks = [
+        asyncio.create_task(push_buzzer_state(websocket, room, user)),
+        asyncio.create_task(sync_clock(websocket)),
+    ]
+    try:
+        while True:
+            message = await websocket.receive_json()
+            if message["type"] == "buzz":
+                received = monotonic()
+                pressed_at = clock.to_server_time(message["sent"] / 1000, received)
+                try:
+                    result = await try_buzz(room, user, pressed_at)
+                except PermissionError:
+                    result = None
+                stats.BUZZ_ARBITRATION.add((monotonic() - received) * 1000)
+                await websocket.send_json(
+                    {"type": "buzz", "result": result, "sent": message["sent"]}
+                )
+            elif message["type"] == "pong":
+                stats.ACTIVE.seen("player", (room.id, user.name))
+                clock.sample(message["server"], message["client"] / 1000, monotonic())
+            elif message["type"] == "latency":
+                stats.BUZZ_ROUNDTRIP.add(float(message["roundtrip"]))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        if room.arbiter.clocks.get(user.name) is clock:
+            del room.arbiter.clocks[user.name]
+
+
+@router.get("/stats")
+async def get_stats(
+    user: User = Depends(auth.admin), room: rooms.Room = Depends(rooms.get)
+):
+    return {
+        "buzz_arbitration_ms": stats.BUZZ_ARBITRATION.summary(),
+        "buzz_roundtrip_ms": stats.BUZZ_ROUNDTRIP.summary(),
+        "buzz_margin_ms": stats.BUZZ_MARGIN.summary(),
+        "render_cache": cache.RENDERS.stats(),
+        "clocks": {
+            who: {"offset_ms": clock.best[1] * 1000, "rtt_ms": clock.rtt * 1000}
+            for who, clock in room.arbiter.clocks.items()
+            if clock.samples
+        },
+    }
+
+
+def clients():
+    counts = stats.ACTIVE.counts()
+    counts["stage"] += len(route_ui.STAGE_STREAMS)
+    return {role: counts[role] for role in ("admin", "player", "stage")}
+
+
+stats.Gauge(
+    "lonelyconnect_clients",
+    "Clients seen in the last minute or connected right now, by role.",
+    "role",
+    clients,
+)
+
+
+@app.get("/metrics")
+async def metrics(user: User = Depends(auth.server_admin)):
+    """Everything in stats.METRICS, for Prometheus to scrape."""
+    return PlainTextResponse(stats.exposition(), media_type="text/plain; version=0.0.4")
+
+
+@router.put("/buzz/{state}")
+async def set_buzz(
+    state: BuzzState,
+    user: User = Depends(auth.admin),
+    room: rooms.Room = Depends(rooms.get),
+):
+    return await room.submit("set_buzz", state.value)
+
+
+@router.post("/score/{username}")
+async def add_to_score(
+    request: Request,
+    username: str,
+    user: User = Depends(auth.admin),
+    room: rooms.Room = Depends(rooms.get),
+):
+    form_data = await request.form()
+    await room.submit("score", username, int(form_data["points"]))
+
+
+@router.post("/name/{username}")
+async def add_to_score(
+    request: Request,
+    username: str,
+    user: User = Depends(auth.admin),
+    room: rooms.Room = Depends(rooms.get),
+):
+    form_data = await request.form()
+    await room.submit("name", username, form_data["teamname"].upper())
+
+
+@app.post("/rooms")
+async def create_room(user: User = Depends(auth.server_admin)):
+    room = rooms.create()
+    code = random_token(6)
+    await room.submit("pair", code, "admin", time.time())
+    return {"room": room.id, "admin_code": code}
+
+
+@app.delete("/rooms/{room_id}")
+async def delete_room(room_id: str, user: User = Depends(auth.server_admin)):
+    try:
+        rooms.delete(room_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="No such room")
+
+
+app.include_router(router)
+app.include_router(router, prefix="/rooms/{room_id}")
+app.include_router(ui_routes, prefix="/ui")
+app.include_router(ui_routes, prefix="/rooms/{room_id}/ui")
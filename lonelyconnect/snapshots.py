@@ -0,0 +1,49 @@
+"""
+Snapshots of rooms as plain JSON: only what changed since the game was loaded,
+with the pack it was loaded from referenced by its hash (see packs.py).
+
+Every snapshot carries the SCHEMA it was written with. When the format
+changes, increase SCHEMA and add a function to MIGRATIONS that turns a
+snapshot of the previous schema into one of the new.
+"""
+
+from . import game
+from .models import User
+
+SCHEMA = 1
+
+# schema of the snapshot -> function returning it in the next schema
+MIGRATIONS = {}
+
+
+def dump(room):
+    return {
+        "schema": SCHEMA,
+        "game": room.game.dump_state(),
+        "users": {name: user.descriptive_name for name, user in room.users.items()},
+        "tokens": room.tokens.dump(),
+        "codes": room.codes.dump(),
+        "revoked": room.revoked.dump(),
+    }
+
+
+def restore(room, snapshot):
+    if snapshot["schema"] > SCHEMA:
+        raise ValueError(
+            f"Snapshot is from a newer version (schema {snapshot['schema']})"
+        )
+    while snapshot["schema"] < SCHEMA:
+        snapshot = MIGRATIONS[snapshot["schema"]](snapshot)
+    restored = game.Game()
+    restored.restore_state(snapshot["game"])
+    users = {
+        name: User(name=name, descriptive_name=descriptive_name)
+        for name, descriptive_name in snapshot["users"].items()
+    }
+    room.state = (
+        restored,
+        users,
+        snapshot["tokens"],
+        snapshot["codes"],
+        snapshot["revoked"],
+    )
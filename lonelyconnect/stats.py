@@ -0,0 +1,207 @@
+import bisect
+from time import monotonic
+from collections import Counter, deque
+
+# everything exposition() shows, in the order it was made
+METRICS = []
+# in seconds, from a fraction of a buzz to a stalled event loop
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+class Buckets:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.sum += seconds
+
+
+class Histogram:
+    """
+    How long something took, in seconds, counted by bucket as Prometheus
+    wants it; cheap enough for every request. With a label, there are
+    separate counts for each of its values, see labels().
+    """
+
+    def __init__(self, name, help, label=None, buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = buckets
+        self.children = {}
+        if not label:
+            self.labels(None)  # shown from the start, even if it stays empty
+        METRICS.append(self)
+
+    def labels(self, value):
+        try:
+            return self.children[value]
+        except KeyError:
+            return self.children.setdefault(value, Buckets(self.buckets))
+
+    def observe(self, seconds):
+        self.labels(None).observe(seconds)
+
+    def expose(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for value, child in self.children.items():
+            labels = f'{self.label}="{value}",' if self.label else ""
+            total = 0
+            for bound, count in zip((*self.buckets, "+Inf"), child.counts):
+                total += count
+                yield f'{self.name}_bucket{{{labels}le="{bound}"}} {total}'
+            labels = labels and f"{{{labels[:-1]}}}"
+            yield f"{self.name}_sum{labels} {child.sum}"
+            yield f"{self.name}_count{labels} {total}"
+
+
+class Gauge:
+    """A value (by label) that is asked for when exposition() is."""
+
+    def __init__(self, name, help, label, values):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.values = values  # () -> {label value: value}
+        METRICS.append(self)
+
+    def expose(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        for value, number in self.values().items():
+            labels = f'{{{self.label}="{value}"}}' if self.label else ""
+            yield f"{self.name}{labels} {number}"
+
+
+def exposition():
+    """All METRICS in Prometheus' text format."""
+    return "".join(f"{line}\n" for metric in METRICS for line in metric.expose())
+
+
+class Samples:
+    """
+    The most recent measurements of something in milliseconds; all of them
+    also go to histogram (in seconds) if there is one.
+    """
+
+    def __init__(self, size=1000, histogram=None):
+        self.values = deque(maxlen=size)
+        self.histogram = histogram
+
+    def add(self, value):
+        self.values.append(value)
+        if self.histogram:
+            self.histogram.observe(value / 1000)
+
+    def summary(self):
+        if not self.values:
+            return {"count": 0}
+        ordered = sorted(self.values)
+        return {
+            "count": len(ordered),
+            "p50": ordered[len(ordered) // 2],
+            "p99": ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)],
+            "max": ordered[-1],
+        }
+
+
+class Recent:
+    """Who was seen lately, by role; cheap enough to note on every request."""
+
+    def __init__(self, window=60, limit=4096):
+        self.window = window
+        self.limit = limit
+        self.last_seen = {}  # (role, who) -> monotonic()
+
+    def seen(self, role, who):
+        self.last_seen[role, who] = monotonic()
+        if len(self.last_seen) > self.limit:
+            self.counts()
+
+    def counts(self):
+        cutoff = monotonic() - self.window
+        for key, when in list(self.last_seen.items()):
+            if when < cutoff:
+                del self.last_seen[key]
+        return Counter(role for role, _ in self.last_seen)
+
+
+class Timing:
+    """
+    ASGI middleware timing requests by route (e.g. /rooms/{room_id}/stage),
+    up to the start of the response, so that streams count as the wait for
+    their first event.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.routes = None  # (endpoint, in a room?) -> path
+
+    def route(self, scope):
+        if self.routes is None:
+            self.routes = {
+                (route.endpoint, "room_id" in route.param_convertors): route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        in_room = "room_id" in scope.get("path_params", {})
+        route = self.routes.get((scope.get("endpoint"), in_room))
+        if route:
+            return route
+        return "/static" if scope["path"].startswith("/static/") else "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = monotonic()
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                REQUESTS.labels(self.route(scope)).observe(monotonic() - start)
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
+
+
+REQUESTS = Histogram(
+    "lonelyconnect_request_seconds",
+    "Time until the response starts, by route.",
+    "route",
+)
+RENDERS = Histogram(
+    "lonelyconnect_render_seconds",
+    "Time spent rendering templates (cache misses only), by template.",
+    "template",
+)
+COMMAND_WAIT = Histogram(
+    "lonelyconnect_command_wait_seconds",
+    "Time commands wait for their room's writer, by command.",
+    "command",
+)
+BUZZ_VISIBLE = Histogram(
+    "lonelyconnect_buzz_visible_seconds",
+    "Time from receiving a buzz to its outcome being visible to everyone.",
+)
+LOOP_LAG = Histogram(
+    "lonelyconnect_event_loop_lag_seconds",
+    "How much later than asked for the event loop gets to things.",
+)
+
+# from receiving a buzz to having decided who gets it
+BUZZ_ARBITRATION = Samples()
+# from pressing the buzzer to seeing the result, as reported by the buzzer
+BUZZ_ROUNDTRIP = Samples(
+    histogram=Histogram(
+        "lonelyconnect_buzz_roundtrip_seconds",
+        "Time from pressing a buzzer to seeing the result, says the buzzer.",
+    )
+)
+# how much earlier the winning buzz was pressed than the runner-up
+BUZZ_MARGIN = Samples()
+# clients that made a request lately, see clients() in lonelyconnect
+ACTIVE = Recent()
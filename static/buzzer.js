@@ -0,0 +1,43 @@
+// The socket is only a faster path: while it isn't open, the htmx
+// attributes in buzzer.html poll and buzz over plain HTTP.
+if (!window.buzzerSocket) {
+    window.buzzerConnected = function() {
+        return window.buzzerSocket && window.buzzerSocket.readyState === WebSocket.OPEN;
+    };
+    window.connectBuzzer = function() {
+        var scheme = location.protocol === "https:" ? "wss:" : "ws:";
+        var main = document.querySelector("#main");
+        var socket = new WebSocket(scheme + "//" + location.host + main.dataset.prefix + "/buzz/ws");
+        // the token goes in the first message: URLs end up in access logs
+        socket.onopen = function() {
+            socket.send(JSON.stringify({type: "auth", token: main.dataset.token}));
+        };
+        socket.onmessage = function(evt) {
+            var message = JSON.parse(evt.data);
+            var button = document.querySelector("#buzzerbutton");
+            if (message.type === "state") {
+                button.className = "buzzer " + message.buzz_state;
+                button.setAttribute("disabled", message.buzz_state === "inactive" ? "disabled" : "");
+                var countdown = document.querySelector("#countdown");
+                countdown.dataset.total = message.time_total || "";
+                countdown.dataset.remaining = message.time_remaining || "";
+                countdown.dataset.frozen = message.time_frozen || "";
+                countdown.received = performance.now();
+            } else if (message.type === "ping") {
+                socket.send(JSON.stringify({type: "pong", server: message.server, client: performance.now()}));
+            } else if (message.type === "buzz" && message.sent) {
+                var roundtrip = performance.now() - message.sent;
+                console.log("buzz round trip: " + roundtrip.toFixed(1) + "ms");
+                socket.send(JSON.stringify({type: "latency", roundtrip: roundtrip}));
+            }
+        };
+        socket.onclose = function() { setTimeout(window.connectBuzzer, 1000); };
+        window.buzzerSocket = socket;
+    };
+    document.addEventListener("click", function(evt) {
+        if (buzzerConnected() && evt.target.closest("#buzzerbutton")) {
+            buzzerSocket.send(JSON.stringify({type: "buzz", sent: performance.now()}));
+        }
+    });
+    connectBuzzer();
+}
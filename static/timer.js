@@ -0,0 +1,38 @@
+// Timers count down by themselves: the server only says how much they have
+// left (or had left when they stopped), and again when that changes. They
+// count from when that came, on this browser's clock rather than comparing
+// it with the server's. See Timer.stage() in game.py.
+if (!window.timersRunning) {
+    window.timersRunning = true;
+    // swapped in content came just now, even if this tab doesn't draw yet
+    document.addEventListener("htmx:load", function(evt) {
+        var elt = evt.detail.elt, timers = ".timer, .countdown";
+        var received = function(timer) { timer.received = performance.now(); };
+        if (elt.matches && elt.matches(timers)) {
+            received(elt);
+        }
+        elt.querySelectorAll(timers).forEach(received);
+    });
+    var secondsLeft = function(timer) {
+        if (timer.dataset.frozen) {
+            return parseFloat(timer.dataset.frozen);
+        }
+        if (timer.received === undefined) {
+            timer.received = performance.now();
+        }
+        var elapsed = (performance.now() - timer.received) / 1000;
+        return Math.max(0, parseFloat(timer.dataset.remaining) - elapsed) || 0;
+    };
+    var draw = function() {
+        document.querySelectorAll(".timer").forEach(function(timer) {
+            var left = secondsLeft(timer);
+            timer.style.display = left ? "" : "none";
+            timer.firstElementChild.style.width = (left * 100) / timer.dataset.total + "%";
+        });
+        document.querySelectorAll(".countdown").forEach(function(countdown) {
+            countdown.innerText = countdown.dataset.total ? Math.floor(secondsLeft(countdown)) || "" : "";
+        });
+        requestAnimationFrame(draw);
+    };
+    requestAnimationFrame(draw);
+}
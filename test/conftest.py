@@ -6,7 +6,7 @@ import pytest
 import yaml
 from fastapi.testclient import TestClient
 
-from lonelyconnect import app, auth, game, startup, shutdown
+from lonelyconnect import app, auth, game, seen, startup, shutdown
 
 
 @pytest.fixture
@@ -46,9 +46,12 @@ def sample_game():
 
 
 @pytest.fixture(scope="session")
-def requests():
+def requests(tmp_path_factory):
     client = TestClient(app)
     os.environ["lonelyconnect_no_swap"] = "1"
+    # nothing the tests do ends up next to a real show's files
+    os.environ["lonelyconnect_packs"] = str(tmp_path_factory.mktemp("packs"))
+    seen.SEEN = seen.SeenStore(str(tmp_path_factory.mktemp("seen")))
     asyncio.run(startup())
     yield client
     asyncio.run(shutdown())
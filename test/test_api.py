@@ -1,11 +1,10 @@
-import os
 import asyncio
 from pathlib import Path
-from contextlib import contextmanager
 
 import pytest
+from starlette.websockets import WebSocketDisconnect
 
-from lonelyconnect import game, startup, shutdown, auth
+from lonelyconnect import game, rooms, startup, shutdown, auth, stats
 
 
 def test_auth(requests, admin_token):
@@ -41,34 +40,32 @@ def test_roles(requests, admin_token, player_token):
     ).ok
 
 
-@contextmanager
-def hide_true_swap_file():
-    swap_path = Path("swap.bin")
-    if swap_path.exists():
-        hidden_path = swap_path.rename(".pytest-running.swap.bin")
-    else:
-        hidden_path = None
+def test_swap_file(sample_game, tmp_path, monkeypatch):
+    # swap.bin and swap.log are written to the working directory, which
+    # mustn't be the one of a real show
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("lonelyconnect_no_swap")
+    monkeypatch.setenv("lonelyconnect_admin_code", "123456")
+    monkeypatch.setenv("lonelyconnect_packs", str(tmp_path / "packs"))
+    asyncio.run(startup())
+    game.GAME = sample_game
+    game.GAME.action("next")
+    game.GAME.action("start_left")
+    game.GAME.points["right"] = 3
+    stage = game.GAME.stage()
+    asyncio.run(shutdown())
+    game.GAME = game.Game()
+    asyncio.run(startup())
     try:
-        yield
+        assert game.GAME.stage() == {
+            **stage,
+            "time_remaining": pytest.approx(stage["time_remaining"], abs=1),
+        }
     finally:
-        if hidden_path:
-            hidden_path.rename(swap_path)
-
-
-def test_swap_file(sample_game):
-    original = os.environ.pop("lonelyconnect_no_swap")
-    os.environ["lonelyconnect_admin_code"] = "123456"
-    with hide_true_swap_file():
-        asyncio.run(startup())
-        game.GAME = sample_game
-        game.GAME.arbitrary = "foobar"
+        # closes the journal again, the rest of the session runs without one
         asyncio.run(shutdown())
-        game.GAME.arbitrary = "barfoo"
-        asyncio.run(startup())
-    assert game.GAME.arbitrary == "foobar"
-    del game.GAME.arbitrary
-    if original:
-        os.environ["lonelyconnect_no_swap"] = original
+    assert rooms.JOURNAL is None
+    assert Path("swap.bin").exists()
 
 
 def test_various_admin_functions(requests, admin_token, sample_game):
@@ -91,3 +88,110 @@ def test_various_admin_functions(requests, admin_token, sample_game):
         headers={"Authorization": f"Bearer {admin_token}"},
     )
     assert auth.USERS["right"].descriptive_name == "FOOBAR"
+
+
+def receive(ws, *types):
+    """Next message of one of the given types, answering pings on the way."""
+    while True:
+        message = ws.receive_json()
+        if message["type"] == "ping":
+            ws.send_json({"type": "pong", "server": message["server"], "client": 0})
+        if message["type"] in types:
+            return message
+
+
+def test_buzz_socket(requests, admin_token, player_token, sample_game):
+    game.GAME = sample_game
+    game.GAME.buzz_state = "inactive"
+    with pytest.raises(WebSocketDisconnect):
+        with requests.websocket_connect("/buzz/ws") as ws:
+            ws.send_json({"type": "auth", "token": admin_token})
+            ws.receive_json()
+    # not in the URL, where it would be logged
+    with pytest.raises(WebSocketDisconnect):
+        with requests.websocket_connect(f"/buzz/ws?token={player_token}") as ws:
+            ws.send_json({"type": "buzz", "sent": 1.5})
+            ws.receive_json()
+
+    with requests.websocket_connect("/buzz/ws") as ws:
+        ws.send_json({"type": "auth", "token": player_token})
+        assert receive(ws, "state")["buzz_state"] == "inactive"
+        ws.send_json({"type": "buzz", "sent": 1.5})
+        assert receive(ws, "buzz") == {"type": "buzz", "result": None, "sent": 1.5}
+
+        game.GAME.buzz_state = "active"
+        ws.send_json({"type": "buzz", "sent": 2.5})
+        assert receive(ws, "buzz") == {"type": "buzz", "result": "right", "sent": 2.5}
+        assert receive(ws, "state")["buzz_state"] == "buzzed"
+        ws.send_json({"type": "latency", "roundtrip": 12.5})
+
+    r = requests.get("/stats", headers={"Authorization": f"Bearer {admin_token}"})
+    assert r.json()["buzz_arbitration_ms"]["count"] == 2
+
+
+def test_etags(requests, admin_token, sample_game):
+    game.GAME = sample_game
+    r = requests.get("/stage")
+    tag = r.headers["etag"]
+    assert requests.get("/stage", headers={"If-None-Match": tag}).status_code == 304
+    assert requests.get("/ui/stage", headers={"If-None-Match": tag}).status_code == 304
+    assert (
+        requests.get(
+            "/actions",
+            headers={"Authorization": f"Bearer {admin_token}", "If-None-Match": tag},
+        ).status_code
+        == 304
+    )
+
+    requests.post(
+        "/score/left",
+        data={"points": 1},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    r = requests.get("/stage", headers={"If-None-Match": tag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != tag
+    assert r.json()["points"]["left"] == 1
+
+
+def test_histogram():
+    histogram = stats.Histogram("test_seconds", "For testing.", "route")
+    histogram.labels("/a").observe(0.001)
+    histogram.labels("/a").observe(3)
+    lines = list(histogram.expose())
+    assert 'test_seconds_bucket{route="/a",le="0.0005"} 0' in lines
+    assert 'test_seconds_bucket{route="/a",le="0.001"} 1' in lines
+    assert 'test_seconds_bucket{route="/a",le="2.5"} 1' in lines
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 2' in lines
+    assert 'test_seconds_count{route="/a"} 2' in lines
+    stats.METRICS.remove(histogram)
+
+
+def test_metrics(requests, admin_token, player_token, sample_game):
+    game.GAME = sample_game
+    assert requests.get("/metrics").status_code == 401
+    r = requests.get("/metrics", headers={"Authorization": f"Bearer {player_token}"})
+    assert r.status_code == 403
+
+    game.GAME.buzz_state = "active"
+    requests.post("/buzz", headers={"Authorization": f"Bearer {player_token}"})
+    requests.get("/ui/stage?poll=true")
+    requests.get("/rooms/default/stage")
+    r = requests.get("/metrics", headers={"Authorization": f"Bearer {admin_token}"})
+    assert r.headers["content-type"].startswith("text/plain")
+    lines = r.text.splitlines()
+    for metric in (
+        'lonelyconnect_request_seconds_count{route="/ui/stage"}',
+        'lonelyconnect_request_seconds_count{route="/rooms/{room_id}/stage"}',
+        'lonelyconnect_render_seconds_count{template="stage.html"}',
+        'lonelyconnect_command_wait_seconds_count{command="buzz"}',
+        "lonelyconnect_buzz_visible_seconds_count",
+        "lonelyconnect_event_loop_lag_seconds_count",
+    ):
+        assert any(line.startswith(metric + " ") for line in lines), metric
+    clients = {
+        line.split('"')[1]: int(line.split()[-1])
+        for line in lines
+        if line.startswith("lonelyconnect_clients{")
+    }
+    assert min(clients.values()) >= 1 and clients.keys() == {"admin", "player", "stage"}
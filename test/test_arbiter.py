@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from lonelyconnect.arbiter import Arbiter, ClockSync
+
+
+def test_clock_sync():
+    clock = ClockSync()
+    assert clock.to_server_time(123, 10) == 10
+
+    # client clock is 100s ahead, 20ms each way
+    clock.sample(10, 110.02, 10.04)
+    # a worse sample (more asymmetric, slower) doesn't count
+    clock.sample(20, 120.09, 20.1)
+    assert clock.rtt == pytest.approx(0.04)
+    assert clock.best[1] == pytest.approx(100)
+
+    assert clock.to_server_time(130.01, 30.03) == pytest.approx(30.01)
+    # claims to have been pressed way earlier than possible
+    assert clock.to_server_time(100, 30.03) == pytest.approx(29.99)
+    # claims to have been pressed in the future
+    assert clock.to_server_time(140, 30.03) == pytest.approx(30.03)
+
+
+def test_arbiter_orders_by_pressed_time():
+    decided = []
+
+    async def decide(batch):
+        decided.append([who for _pressed_at, who, _future in batch])
+        for i, (_pressed_at, who, future) in enumerate(batch):
+            if i:
+                future.set_exception(PermissionError)
+            else:
+                future.set_result(who)
+
+    async def main():
+        arbiter = Arbiter(decide)
+        arbiter.clocks["left"] = ClockSync()
+        arbiter.clocks["left"].sample(0, 0, 0.05)
+        assert arbiter.window == pytest.approx(0.05)
+        # left arrives first, but right pressed earlier
+        return await asyncio.gather(
+            arbiter.submit("left", 2.0),
+            arbiter.submit("right", 1.99),
+            return_exceptions=True,
+        )
+
+    left, right = asyncio.run(main())
+    assert decided == [["right", "left"]]
+    assert right == "right"
+    assert isinstance(left, PermissionError)
+
+
+def test_arbiter_survives_a_cancelled_submitter():
+    async def decide(batch):
+        for _pressed_at, who, future in batch:
+            if not future.done():
+                future.set_result(who)
+
+    async def main():
+        arbiter = Arbiter(decide)
+        arbiter.clocks["left"] = ClockSync()
+        arbiter.clocks["left"].sample(0, 0, 0.05)
+        first = asyncio.create_task(arbiter.submit("left", 1.0))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(arbiter.submit("right", 1.01))
+        await asyncio.sleep(0)
+        first.cancel()  # e.g. its connection went away
+        assert await asyncio.wait_for(second, 1) == "right"
+        # and the next window opens as usual
+        assert await asyncio.wait_for(arbiter.submit("left", 2.0), 1) == "left"
+
+    asyncio.run(main())
+
+
+def test_arbiter_passes_on_errors():
+    async def decide(batch):
+        raise PermissionError
+
+    async def main():
+        return await Arbiter(decide).submit("left", 1.0)
+
+    with pytest.raises(PermissionError):
+        asyncio.run(main())
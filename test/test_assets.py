@@ -0,0 +1,55 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from lonelyconnect import assets
+
+
+def test_build_and_serve(tmp_path):
+    static = tmp_path / "static"
+    static.mkdir()
+    css = b"body { color: black; }\n" * 100
+    (static / "style.css").write_bytes(css)
+    (static / "picture.png").write_bytes(bytes(range(256)))
+    built = tmp_path / "built"
+    manifest = assets.build(static, built)
+    assert manifest["style.css"].startswith("style.")
+    assert (built / f"{manifest['style.css']}.gz").exists()
+    # not worth it
+    assert not (built / f"{manifest['picture.png']}.gz").exists()
+    # same content, same name
+    assert assets.build(static, built) == manifest
+
+    served = assets.Assets(static, built)
+    assert served.url("style.css") == f"/static/{manifest['style.css']}"
+    assert served.url("elsewhere.png") == "/static/elsewhere.png"
+    app = FastAPI()
+    app.mount("/static", served)
+    client = TestClient(app)
+
+    r = client.get(served.url("style.css"), headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["content-type"].startswith("text/css")
+    assert r.headers["cache-control"] == assets.IMMUTABLE
+    assert int(r.headers["content-length"]) < len(css)
+    assert r.content == css  # decompressed by the client
+    r = client.get(served.url("style.css"), headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers
+    assert r.content == css
+    raw = client.get(
+        served.url("style.css"), headers={"Accept-Encoding": "gzip"}, stream=True
+    ).raw.read(decode_content=False)
+    assert gzip.decompress(raw) == css
+    # unbuilt names still work, but have to be checked for changes
+    r = client.get("/static/style.css")
+    assert r.content == css
+    assert r.headers["cache-control"] == "no-cache"
+    assert client.get("/static/missing.css").status_code == 404
+
+
+def test_pages_use_local_assets(requests):
+    r = requests.get("/ui/stage")
+    assert "unpkg.com" not in r.text
+    assert assets.ASSETS.url("htmx.min.js") in r.text
+    assert requests.get(assets.ASSETS.url("htmx.min.js")).ok
@@ -0,0 +1,160 @@
+import pickle
+import sqlite3
+import asyncio
+
+import pytest
+import uvicorn
+
+from lonelyconnect import backends, entrypoint, game, packs, rooms, shutdown, startup
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Two backends sharing one database, like two worker processes would."""
+    path = tmp_path / "rooms.db"
+    yield backends.SQLiteBackend(path), backends.SQLiteBackend(path)
+
+
+def test_sqlite_commands_see_each_other(workers):
+    a, b = workers
+    room_a, room_b = rooms.Room("x"), rooms.Room("x")
+    a.add(room_a)
+
+    a.execute(room_a, "score", ("left", 3))
+    b.execute(room_b, "score", ("left", 2))
+    assert room_b.game.points["left"] == 5
+    a.execute(room_a, "pair", ("ABCDEF", "right"))
+    assert b.execute(room_b, "login", ("ABCDEF", "token")) == "right"
+    assert a.execute(room_a, "login", ("ABCDEF", "token")) is None
+    assert room_a.tokens == {"token": "right"}
+
+
+def test_sqlite_failed_commands_change_nothing(workers):
+    a, b = workers
+    room_a, room_b = rooms.Room("x"), rooms.Room("x")
+    a.add(room_a)
+    with pytest.raises(PermissionError):
+        a.execute(room_a, "buzz", ("left",))
+    assert b.fetch("x", rooms.Room).stored_version == 0
+    b.execute(room_b, "set_buzz", ("active",))
+    assert a.execute(room_a, "buzz", ("left",)) == "left"
+
+
+def test_sqlite_run_in_a_thread(workers):
+    a, b = workers
+    room_a, room_b = rooms.Room("x"), rooms.Room("x")
+    a.add(room_a)
+
+    async def run():
+        await a.run(room_a, "score", ("left", 3))
+        await b.run(room_b, "score", ("left", 2))
+        with pytest.raises(PermissionError):
+            await b.run(room_b, "buzz", ("left",))
+        # failed commands don't touch the room at all
+        assert room_b.game.points["left"] == 5 and room_b.stored_version == 2
+        await a.run(room_a, "set_buzz", ("active",))
+        return await b.run(room_b, "buzz", ("left",))
+
+    assert asyncio.run(run()) == "left"
+    assert room_a.game.buzz_state == "active"  # until it polls
+    assert b.fetch("x", rooms.Room).game.buzz_state == "left"
+
+
+def test_sqlite_watch_goes_on(workers, monkeypatch, caplog):
+    a, b = workers
+    room = rooms.Room("x")
+    a.add(room)
+    mine = {"x": b.fetch("x", rooms.Room)}
+    a.execute(room, "name", ("left", "FOO"))
+    failures = [sqlite3.OperationalError("database is locked")]
+    changes = b.changes
+
+    def flaky(known):
+        if failures:
+            raise failures.pop()
+        return changes(known)
+
+    monkeypatch.setattr(b, "changes", flaky)
+    monkeypatch.setattr(b, "POLL_INTERVAL", 0.01)
+
+    async def watch_briefly():
+        task = asyncio.create_task(b.watch(mine, keep="default"))
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    asyncio.run(watch_briefly())
+    assert "database is locked" in caplog.text
+    assert mine["x"].users["left"].descriptive_name == "FOO"
+
+
+def test_rooms_of_other_workers_over_http(workers, requests, monkeypatch):
+    a, b = workers
+    monkeypatch.setattr(rooms, "BACKEND", b)
+    monkeypatch.setattr(rooms, "ROOMS", dict(rooms.ROOMS))
+    room = rooms.Room("elsewhere")
+    a.add(room)
+    a.execute(room, "score", ("left", 4))
+    r = requests.get("/rooms/elsewhere/stage")
+    assert r.status_code == 200
+    assert r.json()["points"]["left"] == 4
+
+
+def test_sqlite_poll(workers):
+    a, b = workers
+    room = rooms.Room("x")
+    a.add(room)
+    mine = {"x": b.fetch("x", rooms.Room), "gone": rooms.Room("gone")}
+    mine["gone"].stored_version = 0
+    seen = mine["x"].changes.count
+
+    a.execute(room, "name", ("left", "FOO"))
+    b.poll(mine, keep="default")
+    assert mine["x"].users["left"].descriptive_name == "FOO"
+    assert mine["x"].changes.count == seen + 1
+    assert "gone" not in mine
+
+    b.poll(mine, keep="default")
+    assert mine["x"].changes.count == seen + 1
+
+
+def test_workers_find_each_others_packs(tmp_path, monkeypatch):
+    monkeypatch.setenv("lonelyconnect_no_swap", "1")
+    monkeypatch.setenv("lonelyconnect_packs", str(tmp_path / "packs"))
+    monkeypatch.setattr(rooms, "BACKEND", backends.SQLiteBackend(tmp_path / "db"))
+    monkeypatch.setattr(packs, "PACKS", packs.PackStore())
+    asyncio.run(startup())
+    asyncio.run(shutdown())
+    pack = packs.PACKS.add(
+        {
+            "parts": [
+                {"type": "missing vowels", "groups": [{"name": "A", "phrases": ["b"]}]}
+            ]
+        }
+    )
+    g = game.Game()
+    g.load_pack(pack, 1)
+    pickled = pickle.dumps(g)
+
+    # another worker, which never saw the pack
+    monkeypatch.setattr(packs, "PACKS", packs.PackStore())
+    packs.PACKS.keep_in(tmp_path / "packs")
+    assert pickle.loads(pickled).pack == pack
+
+
+def test_from_environment(monkeypatch, tmp_path):
+    monkeypatch.delenv("lonelyconnect_backend", raising=False)
+    assert isinstance(backends.from_environment(), backends.MemoryBackend)
+    monkeypatch.setenv("lonelyconnect_backend", f"sqlite:{tmp_path / 'x.db'}")
+    assert isinstance(backends.from_environment(), backends.SQLiteBackend)
+    monkeypatch.setenv("lonelyconnect_backend", "carrier-pigeon")
+    with pytest.raises(ValueError):
+        backends.from_environment()
+
+
+def test_workers_need_shared_backend(monkeypatch):
+    monkeypatch.setenv("lonelyconnect_workers", "2")
+    monkeypatch.setattr(uvicorn, "run", lambda *a, **k: k["workers"])
+    with pytest.raises(SystemExit):
+        entrypoint()
+    monkeypatch.setattr(rooms, "BACKEND", backends.SQLiteBackend(":memory:"))
+    assert entrypoint() == 2
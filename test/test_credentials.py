@@ -0,0 +1,84 @@
+import freezegun
+
+from lonelyconnect import credentials, models, rooms, snapshots
+
+
+def test_expiry():
+    tokens = credentials.Credentials(ttl=60, keep=4)
+    with freezegun.freeze_time() as clock:
+        tokens.add("a", "left")
+        clock.tick(30)
+        tokens.add("b", "left")
+        assert dict(tokens) == {"a": "left", "b": "left"}
+        assert models.User(name="left").get_token(tokens) == "b"
+        clock.tick(30)
+        assert "a" not in tokens and tokens.get("b") == "left"
+        assert tokens.pop("a") is None
+        clock.tick(30)
+        assert tokens.newest("left") is None
+        tokens.add("c", "right")
+        # expired ones are forgotten on the way
+        assert list(tokens.entries) == ["c"]
+
+
+def test_bounded():
+    codes = credentials.Credentials(ttl=60, keep=2)
+    for i in range(100):
+        codes.add(f"left{i}", "left", now=i)
+        codes.add(f"admin{i}", "admin", now=i)
+    assert len(codes.entries) == 4
+    assert codes.newest("left") is None  # long expired by the real clock
+    assert codes.pop("admin99", now=100) == "admin"
+    assert codes.pop("admin98", now=200) is None
+    assert list(codes.entries) == ["left98", "left99"]
+
+
+def test_revoked_until_expired():
+    revoked = credentials.revoked()
+    for i in range(1000):
+        revoked.add(f"nonce{i}", "left", now=0, expires=60)
+    assert revoked.pop("nonce0", now=59) == "left"
+    revoked.add("late", "left", now=60)
+    assert list(revoked.entries) == ["late"]
+
+
+def test_update():
+    tokens = credentials.tokens()
+    tokens.add("old", "left")
+    restored = credentials.tokens()
+    restored.update(tokens.dump())
+    assert restored.entries == tokens.entries
+    assert restored == {"old": "left"}
+
+
+def test_signed_tokens():
+    token = credentials.sign("left", "room", 2000, secret="s3cret")
+    claims = credentials.verify(token, "room", now=1000, secret="s3cret")
+    assert claims[:3] == ("left", "room", 2000)
+    assert not credentials.verify(token, "room", now=2000, secret="s3cret")
+    assert not credentials.verify(token, "other", now=1000, secret="s3cret")
+    assert not credentials.verify(token, "room", now=1000, secret="other")
+    forged = token.replace("left", "admin", 1)
+    assert not credentials.verify(forged, "room", now=1000, secret="s3cret")
+    assert not credentials.verify("plain", "room", now=1000, secret="s3cret")
+
+
+def test_signed_login_and_logout(requests, admin_token, monkeypatch):
+    monkeypatch.setattr(credentials, "SECRET", "s3cret")
+    r = requests.post("/rooms", headers={"Authorization": f"Bearer {admin_token}"})
+    prefix, code = f"/rooms/{r.json()['room']}", r.json()["admin_code"]
+    room = rooms.get_or_none(r.json()["room"])
+
+    r = requests.post(f"{prefix}/login", data={"username": "x", "password": code})
+    token = r.json()["access_token"]
+    assert token.startswith(f"admin.{room.id}.")
+    assert not room.tokens  # nothing to look up
+    auth = {"Authorization": f"Bearer {token}"}
+    assert requests.get(f"{prefix}/codes", headers=auth).ok
+    assert token in requests.get(f"{prefix}/ui/admin", headers=auth).text
+
+    assert requests.post(f"{prefix}/logout", headers=auth).ok
+    assert requests.get(f"{prefix}/codes", headers=auth).status_code == 401
+    assert len(room.revoked) == 1
+    # revocations are kept like everything else
+    assert snapshots.dump(room)["revoked"] == room.revoked.dump()
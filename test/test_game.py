@@ -67,6 +67,7 @@ def test_connections(sample_game):
         time.tick(30.1)  # time expires
         with pytest.raises(PermissionError):
             sample_game.buzz("left")
+        sample_game.expire()
         assert "award_bonus" in dict(sample_game.actions())
         sample_game.action("award_bonus")
     assert sample_game.points == {"left": 4, "right": 1}
@@ -98,8 +99,9 @@ def test_stage_and_secrets_and_actions(sample_game):
         "answer": None,
         "clear": False,
         "steps": [],
-        "time_remaining": None,
         "time_total": None,
+        "time_remaining": None,
+        "time_frozen": None,
         "buzz_state": "inactive",
         "points": {"left": 0, "right": 0},
     }
@@ -113,8 +115,9 @@ def test_stage_and_secrets_and_actions(sample_game):
         "answer": None,
         "clear": False,
         "steps": [{"label": "Hint 1", "type": "text"}],
-        "time_remaining": 29,
         "time_total": 30,
+        "time_remaining": pytest.approx(30, abs=1),
+        "time_frozen": None,
         "buzz_state": "active-left",
         "points": {"left": 0, "right": 0},
     }
@@ -131,8 +134,9 @@ def test_stage_and_secrets_and_actions(sample_game):
             {"label": "Hint 1", "type": "text"},
             {"label": "Hint 2", "type": "text"},
         ],
-        "time_remaining": 29,
         "time_total": 30,
+        "time_remaining": pytest.approx(30, abs=1),
+        "time_frozen": None,
         "buzz_state": "active-left",
         "points": {"left": 0, "right": 0},
     }
@@ -149,8 +153,9 @@ def test_stage_and_secrets_and_actions(sample_game):
             {"label": "Hint 1", "type": "text"},
             {"label": "Hint 2", "type": "text"},
         ],
-        "time_remaining": 29,
         "time_total": 30,
+        "time_remaining": None,
+        "time_frozen": pytest.approx(30, abs=1),
         "buzz_state": "left",
         "points": {"left": 0, "right": 0},
     }
@@ -173,5 +178,58 @@ def test_buzz_timer(sample_game):
     assert sample_game.buzz_state == "active-left"
     with freezegun.freeze_time() as time:
         time.tick(30.1)  # time expires
+        tag = sample_game.state_tag
         sample_game.stage()
+        sample_game.actions()
+        assert sample_game.state_tag == tag  # looking changes nothing
+        assert sample_game.buzz_state == "active-left"
+        sample_game.expire()
     assert sample_game.buzz_state == "inactive"
+    assert sample_game.part.task.n_shown == 4
+    assert sample_game.state_tag != tag
+
+
+def test_buzz_before_expiry(sample_game):
+    sample_game.action("next")  # load part
+    sample_game.action("next")  # load question
+    sample_game.action("start_left")
+    sample_game.buzz("left")
+    sample_game.expire()  # came in after the buzz, too late
+    assert sample_game.buzz_state == "left"
+    assert sample_game.part.task.timer.remaining
+
+
+@pytest.mark.parametrize(
+    ("buzz_state", "left", "right"),
+    [
+        ("inactive", "inactive", "inactive"),
+        ("active", "buzzable", "buzzable"),
+        ("active-left", "buzzable", "inactive"),
+        ("right", "inactive", "buzzed"),
+    ],
+)
+def test_buzzer_state(sample_game, buzz_state, left, right):
+    sample_game.buzz_state = buzz_state
+    assert sample_game.buzzer_state("left") == left
+    assert sample_game.buzzer_state("right") == right
+
+
+def test_state_tag(sample_game):
+    tags = {sample_game.state_tag}
+    sample_game.action("next")  # load part
+    tags.add(sample_game.state_tag)
+    sample_game.action("next")  # load question
+    tags.add(sample_game.state_tag)
+    with freezegun.freeze_time() as clock:
+        sample_game.action("start_left")
+        tags.add(sample_game.state_tag)
+        stage = sample_game.stage()
+        clock.tick(1.5)  # clients count down by themselves
+        assert sample_game.state_tag in tags
+        assert sample_game.stage() == {
+            **stage,
+            "time_remaining": pytest.approx(stage["time_remaining"] - 1.5),
+        }
+        sample_game.buzz("left")  # stops the timer
+        tags.add(sample_game.state_tag)
+    assert len(tags) == 5
@@ -0,0 +1,125 @@
+import json
+import pickle
+import asyncio
+
+from lonelyconnect import backends, game, journal, packs, rooms, snapshots
+
+PACK = {
+    "parts": [
+        {
+            "type": "missing vowels",
+            "groups": [
+                {
+                    "name": f"Group {i}",
+                    "phrases": [f"phrase number {i}{j}" for j in "abcd"],
+                }
+                for i in range(4)
+            ],
+        }
+    ]
+}
+
+
+def open_journal(tmp_path, room):
+    j = journal.Journal(tmp_path / "swap.bin", tmp_path / "swap.log")
+    j.recover(
+        lambda states: snapshots.restore(room, states[room.id]),
+        lambda room_id, command, args: backends.MemoryBackend().execute(
+            room, command, args
+        ),
+    )
+    return j
+
+
+def flush(j, room):
+    async def run_briefly():
+        task = asyncio.create_task(j.run(lambda: {room.id: snapshots.dump(room)}))
+        await asyncio.sleep(j.FLUSH_INTERVAL * 3)
+        task.cancel()
+
+    asyncio.run(run_briefly())
+
+
+def phrases(room):
+    part = room.game.parts[0]
+    return [
+        (phrase.answer, phrase.obfuscated)
+        for group in map(part.make_task, part.tasks)
+        for phrase in group.phrases
+    ]
+
+
+def play(tmp_path, monkeypatch):
+    room = rooms.Room("x")
+    monkeypatch.setattr(rooms, "JOURNAL", open_journal(tmp_path, room))
+    room.execute("load", packs.PACKS.add(PACK), 1234)
+    room.execute("score", "left", 2)
+    room.execute("pair", "ABCDEF", "right")
+    room.execute("login", "ABCDEF", "token")
+    return room
+
+
+def test_recover_after_crash(tmp_path, monkeypatch):
+    room = play(tmp_path, monkeypatch)
+    flush(rooms.JOURNAL, room)
+    # no close(): we crashed
+    recovered = rooms.Room("x")
+    open_journal(tmp_path, recovered)
+    assert phrases(recovered) == phrases(room)
+    assert recovered.game.points["left"] == 2
+    assert recovered.tokens == {"token": "right"}
+
+
+def test_torn_entry_is_ignored(tmp_path, monkeypatch):
+    room = play(tmp_path, monkeypatch)
+    flush(rooms.JOURNAL, room)
+    with open(tmp_path / "swap.log", "a") as f:
+        f.write('[5, "x", "sco')
+    recovered = rooms.Room("x")
+    open_journal(tmp_path, recovered)
+    assert recovered.game.points["left"] == 2
+
+
+def test_snapshots(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal.Journal, "SNAPSHOT_EVERY", 3)
+    room = play(tmp_path, monkeypatch)
+    flush(rooms.JOURNAL, room)
+    assert (tmp_path / "swap.bin").exists()
+    assert (tmp_path / "swap.log").read_text() == ""
+    room.execute("score", "left", 1)
+    flush(rooms.JOURNAL, room)
+
+    recovered = rooms.Room("x")
+    open_journal(tmp_path, recovered)
+    assert phrases(recovered) == phrases(room)
+    assert recovered.game.points["left"] == 3
+
+
+def test_entries_in_snapshot_are_skipped(tmp_path, monkeypatch):
+    room = play(tmp_path, monkeypatch)
+    flush(rooms.JOURNAL, room)
+    # crash after writing a snapshot, but before emptying the log
+    with open(tmp_path / "swap.bin", "w") as f:
+        json.dump({"seq": rooms.JOURNAL.seq, "rooms": {"x": snapshots.dump(room)}}, f)
+    recovered = rooms.Room("x")
+    open_journal(tmp_path, recovered)
+    assert recovered.game.points["left"] == 2
+
+
+def test_close(tmp_path, monkeypatch):
+    room = play(tmp_path, monkeypatch)
+    rooms.JOURNAL.close({"x": snapshots.dump(room)})
+    assert not (tmp_path / "swap.log").exists()
+    recovered = rooms.Room("x")
+    open_journal(tmp_path, recovered)
+    assert recovered.game.points["left"] == 2
+
+
+def test_refuse_swap_files_from_before_rooms(tmp_path, caplog):
+    old = pickle.dumps(game.Game())  # what swap.bin used to be
+    (tmp_path / "swap.bin").write_bytes(old)
+    room = rooms.Room("x")
+    open_journal(tmp_path, room).close({})
+    assert room.game.pack is None
+    assert "can't be restored" in caplog.text
+    assert (tmp_path / "swap.bin.old").read_bytes() == old
@@ -0,0 +1,88 @@
+import sys
+
+import pytest
+
+from lonelyconnect import entrypoint, game, library, packs
+
+
+def question(i):
+    return {
+        "answer": f"Answer {i}",
+        "explanation": f"Explanation {i}",
+        "steps": [{"label": f"Clue {i}.{j}"} for j in range(4)],
+    }
+
+
+def bank(size):
+    return {
+        "parts": [
+            {"type": "connections", "questions": [question(i) for i in range(size)]},
+            {"type": "sequences", "questions": [question(i) for i in range(size)]},
+            {
+                "type": "missing vowels",
+                "groups": [
+                    {"name": f"Group {i}", "phrases": ["one phrase", "another"]}
+                    for i in range(size)
+                ],
+            },
+        ]
+    }
+
+
+@pytest.fixture
+def lib(tmp_path):
+    yield library.Library(tmp_path / "library.db")
+
+
+def test_add_and_search(lib):
+    assert lib.add_game(bank(10)) == 30
+    assert lib.add_game(bank(12)) == 6  # the rest are there already
+    assert lib.count() == 36
+    assert lib.count("sequences") == 12
+
+    found = lib.search('"clue 11.2"')
+    assert {result["kind"] for result in found} == {"connections", "sequences"}
+    assert found[0]["item"] == question(11)
+    assert lib.search("answer")
+    with pytest.raises(ValueError):
+        lib.search('"unbalanced')
+
+
+def test_assemble_only_unused(lib):
+    lib.add_game(bank(12))
+    first, second = lib.assemble(), lib.assemble()
+    game.validate(first)
+    for kind, count in library.LAYOUT:
+        assert lib.count(kind, unused=True) == 12 - 2 * count
+    # no question twice
+    answers = [
+        question["answer"]
+        for part in first["parts"] + second["parts"]
+        if part["type"] == "connections"
+        for question in part["questions"]
+    ]
+    assert len(answers) == len(set(answers)) == 12
+    with pytest.raises(ValueError, match="Only 0 unused connections"):
+        lib.assemble()
+
+
+def test_routes(requests, admin_token, lib, monkeypatch, tmp_path):
+    auth = {"Authorization": f"Bearer {admin_token}"}
+    monkeypatch.setattr(library, "LIBRARY", None)
+    assert requests.post("/library/game", headers=auth).status_code == 404
+
+    monkeypatch.setattr(library, "LIBRARY", lib)
+    path = tmp_path / "bank.yml"
+    path.write_text(packs.json.dumps(bank(6)))
+    monkeypatch.setattr(sys, "argv", ["lonelyconnect", "import", str(path)])
+    with pytest.raises(SystemExit) as exit:
+        entrypoint()
+    assert exit.value.code == 0
+
+    assert "Load a new game" in requests.get("/ui/admin", headers=auth).text
+    assert requests.post("/library/game", headers=auth).ok
+    assert game.GAME.parts[0].items[0]["answer"].startswith("Answer")
+    assert requests.post("/library/game", headers=auth).status_code == 409
+    r = requests.get("/library/search", params={"q": "clue"}, headers=auth)
+    assert len(r.json()) == 12
+    assert all(result["uses"] == 1 for result in r.json())
@@ -0,0 +1,179 @@
+import os
+import sys
+import pickle
+import threading
+import subprocess
+
+import pytest
+
+from lonelyconnect import entrypoint, game, packs
+
+with open("tutorial.yml", "rb") as f:
+    TUTORIAL = f.read()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = packs.PackStore()
+    store.keep_in(tmp_path)
+    yield store
+
+
+def test_compile_once(store, tmp_path, monkeypatch):
+    parsed = []
+    parse = packs.parse
+    monkeypatch.setattr(packs, "parse", lambda raw: parsed.append(raw) or parse(raw))
+    digest = store.compile(TUTORIAL, game.validate, "tutorial.yml")
+    assert store.compile(TUTORIAL, game.validate) == digest
+    assert len(parsed) == 1
+    assert store.available() == {digest: "tutorial.yml"}
+
+    # another process finds it on disk
+    other = packs.PackStore()
+    other.keep_in(tmp_path)
+    assert other.compile(TUTORIAL, game.validate) == digest
+    assert len(parsed) == 1
+    assert other.get(digest).decode() == store.get(digest).decode()
+
+
+def test_workers_write_the_index_at_once(store, tmp_path, monkeypatch):
+    other = packs.PackStore()
+    other.keep_in(tmp_path)
+    replace = packs.os.replace
+
+    def interleaved(source, target):
+        # the other worker writes the index while this one is about to
+        monkeypatch.setattr(packs.os, "replace", replace)
+        other.names["b"] = "b.yml"
+        writers.append(threading.Thread(target=other._save_index))
+        writers[0].start()
+        writers[0].join(0.2)  # it waits for us
+        replace(source, target)
+
+    writers = []
+    store.names["a"] = "a.yml"
+    monkeypatch.setattr(packs.os, "replace", interleaved)
+    store._save_index()
+    writers[0].join()
+    assert store.available() == {"a": "a.yml", "b": "b.yml"}
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_same_pack_in_other_formats(store):
+    digest = store.compile(TUTORIAL, game.validate)
+    as_json = packs.json.dumps(store.get(digest).decode(), indent=2).encode()
+    assert store.compile(as_json, game.validate) == digest
+
+
+@pytest.mark.parametrize(
+    "raw, message",
+    [
+        (b"parts: [", "Not a valid game file"),
+        (b"- just a list", "needs a list of parts"),
+        (b"parts:\n- type: jeopardy", "none of the types"),
+        (b"parts:\n- type: connections\n  questions: []", "list of questions"),
+        (
+            b"parts:\n- type: sequences\n  questions:\n  - answer: A\n"
+            b"    explanation: B\n    steps: [{label: x}]",
+            r"Part 1 \(sequences\) question 1 needs at least 4 steps",
+        ),
+        (
+            b"parts:\n- type: missing vowels\n  groups:\n  - name: A\n"
+            b"    phrases: [{answer: x}]",
+            "group 1 has a phrase",
+        ),
+    ],
+)
+def test_invalid(store, raw, message):
+    with pytest.raises(ValueError, match=message):
+        store.compile(raw, game.validate)
+
+
+def test_compile_command(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("lonelyconnect_packs", str(tmp_path / "packs"))
+    monkeypatch.setattr(packs, "PACKS", packs.PackStore())
+    broken = tmp_path / "broken.yml"
+    broken.write_text("parts: 3")
+    monkeypatch.setattr(sys, "argv", ["lonelyconnect", "compile", "tutorial.yml"])
+    with pytest.raises(SystemExit) as exit:
+        entrypoint()
+    assert exit.value.code == 0
+    digest = capsys.readouterr().out.split(": ")[1].strip()
+    assert (tmp_path / "packs" / f"{digest}.pack").exists()
+
+    monkeypatch.setattr(sys, "argv", ["lonelyconnect", "compile", str(broken)])
+    with pytest.raises(SystemExit) as exit:
+        entrypoint()
+    assert exit.value.code == 1
+
+
+def test_load_compiled(requests, admin_token):
+    auth = {"Authorization": f"Bearer {admin_token}"}
+    r = requests.post("/load", files={"file": b"parts: 3"}, headers=auth)
+    assert r.status_code == 422
+    assert not requests.post("/load/0123", headers=auth).ok
+
+    digest = packs.PACKS.compile(TUTORIAL, game.validate, "tutorial.yml")
+    assert requests.get("/packs", headers=auth).json()[digest] == "tutorial.yml"
+    assert requests.post(f"/load/{digest}", headers=auth).ok
+    assert game.GAME.pack == digest
+    assert f"/load/{digest}" in requests.get("/ui/packs", headers=auth).text
+
+
+def test_load_elsewhere(requests, admin_token, monkeypatch):
+    parsed = []
+    parse = packs.parse
+    monkeypatch.setattr(packs, "parse", lambda raw: parsed.append(raw) or parse(raw))
+    auth = {"Authorization": f"Bearer {admin_token}"}
+    raw = TUTORIAL + b"\n# not parsed before"
+    assert requests.post("/load", files={"file": raw}, headers=auth).ok
+    # by another process, not this one
+    assert not parsed and packs.PARSERS
+    assert game.GAME.pack == packs.PACKS.known(raw)
+
+
+def test_parsers_leave_the_server_alone(tmp_path):
+    # what a spawned parser imports to call build(raw, game.validate), even
+    # where the server couldn't start
+    check = (
+        "import sys; from lonelyconnect import game, packs; "
+        "assert 'fastapi' not in sys.modules"
+    )
+    env = {**os.environ, "PYTHONPATH": os.getcwd()}
+    subprocess.run([sys.executable, "-c", check], cwd=tmp_path, env=env, check=True)
+
+
+def test_only_used_questions_are_decoded(store, monkeypatch):
+    bank = {
+        "parts": [
+            {
+                "type": "connections",
+                "questions": [
+                    {
+                        "answer": f"Answer {i}",
+                        "explanation": "",
+                        "steps": [{"label": f"{i}.{j}"} for j in range(4)],
+                    }
+                    for i in range(1000)
+                ],
+            }
+        ]
+    }
+    digest = store.add(bank)
+    assert store.get(digest).decode() == bank
+    monkeypatch.setattr(packs, "PACKS", store)
+    decoded = []
+    item = packs.Pack.item
+    monkeypatch.setattr(packs.Pack, "item", lambda *a: decoded.append(a) or item(*a))
+
+    g = game.Game()
+    g.load_pack(digest, 1)
+    assert not decoded
+    g.action("next")
+    g.action("next")
+    assert len(decoded) == 1
+    assert g.part.task.answer.startswith("Answer")
+
+    # pickles of games only refer to the pack
+    assert len(pickle.dumps(g)) < 2000
+    assert pickle.loads(pickle.dumps(g)).part.items.pack is store.get(digest)
@@ -0,0 +1,85 @@
+import time
+import asyncio
+
+from lonelyconnect import profiler
+
+
+async def watched(profile, coroutine):
+    """Run coroutine while profile watches the event loop."""
+    watch = asyncio.create_task(profile.watch(interval=0.01))
+    await asyncio.sleep(0.05)
+    try:
+        return await coroutine
+    finally:
+        watch.cancel()
+
+
+def blocking():
+    time.sleep(0.3)
+
+
+async def block():
+    blocking()
+    await asyncio.sleep(0.05)  # so that watch() notices
+
+
+def test_stall():
+    profile = profiler.Profiler(stall=0.1)
+    asyncio.run(watched(profile, block()))
+    [entry] = profile.report()
+    assert entry["what"] == "event loop"
+    assert entry["ms"] >= 250
+    assert entry["samples"] > 5
+    assert entry["stacks"][0][0].startswith("blocking (test_profiler.py:")
+
+
+def test_slow_requests():
+    profile = profiler.Profiler(threshold=0.1, stall=10, keep=2)
+
+    async def app(scope, receive, send):
+        if scope["path"] == "/slow":
+            blocking()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    async def requests():
+        middleware = profiler.Profiling(app, profile)
+        for path in ("/fast", "/slow", "/slow", "/slow", "/fast"):
+            scope = {"type": "http", "method": "GET", "path": path}
+            await middleware(scope, None, send)
+        assert not profile.running
+
+    asyncio.run(watched(profile, requests()))
+    entries = profile.report()
+    assert len(entries) == 2
+    assert [entry["what"] for entry in entries] == ["GET /slow"] * 2
+    assert entries[0]["ms"] >= entries[1]["ms"] >= 250
+    assert entries[0]["stacks"][0][0].startswith("blocking (test_profiler.py:")
+
+
+def test_requests_only_count_their_own_samples():
+    profile = profiler.Profiler(threshold=0.1, stall=10)
+
+    async def app(scope, receive, send):
+        await asyncio.sleep(0.4)  # while someone else blocks the loop
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def send(message):
+        pass
+
+    async def requests():
+        scope = {"type": "http", "method": "GET", "path": "/waiting"}
+        waiting = asyncio.create_task(
+            profiler.Profiling(app, profile)(scope, None, send)
+        )
+        await asyncio.sleep(0.15)
+        blocking()
+        await waiting
+
+    asyncio.run(watched(profile, requests()))
+    [entry] = profile.report()
+    assert entry["ms"] >= 350
+    assert not any("blocking" in where for stack in entry["stacks"] for where in stack)
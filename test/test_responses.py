@@ -0,0 +1,48 @@
+import json
+import datetime
+
+from lonelyconnect import responses
+
+
+def test_fast_json(monkeypatch):
+    content = {"points": {"left": 3}, "when": datetime.date(2021, 9, 1), 1: ["ä"]}
+    fast = responses.FastJSONResponse(content).body
+    monkeypatch.setattr(responses, "orjson", None)
+    fallback = responses.FastJSONResponse(content).body
+    assert json.loads(fast) == json.loads(fallback)
+    assert json.loads(fallback) == {
+        "points": {"left": 3},
+        "when": "2021-09-01",
+        "1": ["ä"],
+    }
+
+
+def test_negotiate():
+    assert responses.negotiate("") is None
+    assert responses.negotiate("gzip, deflate") == "gzip"
+    assert responses.negotiate("gzip;q=0, deflate") is None
+    assert responses.negotiate("*") == responses.ENCODINGS[0][0]
+    assert responses.negotiate("identity") is None
+
+
+def test_compressed_polls(requests):
+    r = requests.get("/ui/stage?poll=true", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert "scoreboard" in r.text  # decompressed by the client
+    etag = r.headers["etag"]
+    assert etag.startswith("W/")
+    r = requests.get(
+        "/ui/stage?poll=true",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+    )
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+
+    r = requests.get("/ui/stage?poll=true", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers
+    assert not r.headers["etag"].startswith("W/")
+    # too small to bother
+    r = requests.get("/stage", headers={"Accept-Encoding": "gzip"})
+    assert len(r.content) < responses.MINIMUM_SIZE
+    assert "content-encoding" not in r.headers
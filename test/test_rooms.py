@@ -0,0 +1,112 @@
+import asyncio
+
+from lonelyconnect import game, rooms
+
+
+def login(requests, prefix, code):
+    r = requests.post(
+        f"{prefix}/login",
+        data={"grant_type": "password", "username": "nobody", "password": code},
+    )
+    assert r.ok
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_rooms(requests, admin_token, player_token, sample_game):
+    game.GAME = sample_game
+    server_admin = {"Authorization": f"Bearer {admin_token}"}
+    assert not requests.post(
+        "/rooms", headers={"Authorization": f"Bearer {player_token}"}
+    ).ok
+    r = requests.post("/rooms", headers=server_admin)
+    room_id, code = r.json()["room"], r.json()["admin_code"]
+    prefix = f"/rooms/{room_id}"
+
+    # the default room's tokens don't work here
+    assert not requests.get(f"{prefix}/codes", headers=server_admin).ok
+    room_admin = login(requests, prefix, code)
+    assert requests.get(f"{prefix}/codes", headers=room_admin).json() == {}
+    code = requests.post(f"{prefix}/pair/left", headers=room_admin).json()
+    room_player = login(requests, prefix, code)
+
+    # games are separate
+    requests.post(f"{prefix}/score/left", data={"points": 7}, headers=room_admin)
+    assert requests.get(f"{prefix}/stage").json()["points"] == {"left": 7, "right": 0}
+    assert requests.get("/stage").json()["points"] == {"left": 0, "right": 0}
+    requests.put(f"{prefix}/buzz/active", headers=room_admin)
+    assert requests.post(f"{prefix}/buzz", headers=room_player).json() == "left"
+    assert game.GAME.buzz_state == "inactive"
+
+    r = requests.get(f"{prefix}/ui/stage")
+    assert f"{prefix}/ui/stage/events" in r.text
+    assert "7" in r.text
+    assert f'"{prefix}/ui/redirect"' in requests.get(f"{prefix}/ui/login").text
+    assert requests.get(f"{prefix}/", allow_redirects=False).headers == {
+        "location": f"{prefix}/ui/login"
+    }
+
+    assert not requests.delete(prefix, headers=room_admin).ok
+    assert requests.delete(prefix, headers=server_admin).ok
+    assert requests.get(f"{prefix}/stage").status_code == 404
+    assert not requests.delete("/rooms/default", headers=server_admin).ok
+
+
+def test_idle_rooms_are_cheap():
+    room = rooms.Room("cheap")
+    assert not hasattr(room, "__dict__")
+    assert room._queue is None and room._view is None and room._expiry is None
+
+
+def test_single_writer(sample_game):
+    room = rooms.Room("writer")
+    room.game = sample_game
+    before = room.view
+    assert room.view is before  # shared by all readers until something changes
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        buzzes = [(0, who, loop.create_future()) for who in ("left", "right")]
+        results = await asyncio.gather(
+            room.submit("set_buzz", "active"),
+            room.submit("score", "left", 3),
+            room.decide_buzzes(buzzes),
+            room.submit("set_buzz", "active"),  # after both buzzes
+            return_exceptions=True,
+        )
+        return results, await asyncio.gather(
+            *(future for _, _, future in buzzes), return_exceptions=True
+        )
+
+    results, (left, right) = asyncio.run(run())
+    assert results[0] == "active"
+    assert left == "left"
+    assert isinstance(right, PermissionError)
+    assert room.game.buzz_state == "active"
+
+    after = room.view
+    assert after is not before
+    assert after.stage["points"]["left"] == 3
+    assert before.stage["points"]["left"] == 0
+    assert after.buzzers == {"left": "buzzable", "right": "buzzable"}
+
+
+def test_timer_expires_by_itself(sample_game):
+    room = rooms.Room("timer")
+    room.game = sample_game
+
+    async def run():
+        for key in ("next", "next", "start_left"):
+            await room.submit("action", key)
+        assert room._expiry
+        timer = room.game.part.task.timer
+        timer.end = timer.end - timer.duration + 0.05
+        room.schedule_expiry()
+        seen = room.changes.count
+        assert await room.changes.wait(seen, 1)
+        return room.view
+
+    view = asyncio.run(run())
+    assert view.stage["buzz_state"] == "inactive"
+    assert len(view.stage["steps"]) == 4
+    assert ("no_points", "No points for either team") in view.actions
+    assert room._expiry is None
@@ -0,0 +1,131 @@
+import hashlib
+
+import pytest
+
+from lonelyconnect import game, packs, seen
+
+
+def key(i):
+    return hashlib.sha256(str(i).encode()).digest()
+
+
+def test_bloom_filter():
+    bloom = seen.BloomFilter()
+    for i in range(10000):
+        bloom.add(key(i))
+    assert all(key(i) in bloom for i in range(10000))
+    assert not any(key(i) in bloom for i in range(10000, 20000))
+
+
+def test_store(tmp_path):
+    store = seen.SeenStore(tmp_path)
+    store.record("thursdays", [key(1)])
+    assert key(1) in seen.SeenStore(tmp_path).get("thursdays")
+    assert key(1) not in seen.SeenStore(tmp_path).get("fridays")
+    assert (tmp_path / "thursdays.bloom").stat().st_size == seen.BloomFilter.BITS // 8
+    with pytest.raises(ValueError):
+        store.get("../etc")
+
+
+def questions(part):
+    return {part.items[i]["answer"] for i in part.choice}
+
+
+def test_league_sees_no_repeats(requests, admin_token, tmp_path, monkeypatch):
+    monkeypatch.setattr(seen, "SEEN", seen.SeenStore(tmp_path))
+    pack = packs.PACKS.add(
+        {
+            "parts": [
+                {
+                    "type": "connections",
+                    "questions": [
+                        {
+                            "answer": f"Answer {i}",
+                            "explanation": "",
+                            "steps": [{"label": f"{i}.{j}"} for j in range(4)],
+                        }
+                        for i in range(12)
+                    ],
+                }
+            ]
+        }
+    )
+    auth = {"Authorization": f"Bearer {admin_token}"}
+
+    def load(**data):
+        assert requests.post(f"/load/{pack}", data=data, headers=auth).ok
+        return questions(game.GAME.parts[0])
+
+    first = load(league="thursdays")
+    second = load(league="thursdays")
+    assert len(first) == len(second) == 6
+    assert not first & second
+    # now everything has been seen
+    assert len(load(league="thursdays")) == 6
+    assert first & load(league="fridays") or second & load(league="fridays")
+    assert (
+        requests.post(f"/load/{pack}", data={"league": "a/b"}, headers=auth).status_code
+        == 422
+    )
+
+
+def test_choices_are_replayed(monkeypatch):
+    pack = packs.PACKS.add(
+        {
+            "parts": [
+                {
+                    "type": "missing vowels",
+                    "groups": [
+                        {"name": f"Group {i}", "phrases": [f"phrase number {i}"]}
+                        for i in range(5)
+                    ],
+                }
+            ]
+        }
+    )
+    bloom = seen.BloomFilter()
+    g = game.Game()
+    g.load_pack(pack, 7)
+    for i in g.choices[0][:2]:
+        bloom.add(g.parts[0].items.key(i))
+    choices, keys = game.choose(pack, 7, bloom)
+    # seen ones last
+    assert choices[0][-2:] == g.choices[0][:2]
+    assert len(keys) == 5
+
+    replayed = game.Game()
+    replayed.load_pack(pack, 7, choices)
+    part = replayed.parts[0]
+    tasks = [part.make_task(task) for task in part.tasks]
+    assert [task.name for task in tasks][-2:] == [
+        f"Group {i}" for i in g.choices[0][:2]
+    ]
+    # obfuscated the same, no matter the order
+    original = g.parts[0]
+    assert sorted(task.phrases[0].obfuscated for task in tasks) == sorted(
+        original.make_task(task).phrases[0].obfuscated for task in original.tasks
+    )
+
+
+def test_missing_vowels_use_up_only_a_round(tmp_path):
+    pack = packs.PACKS.add(
+        {
+            "parts": [
+                {
+                    "type": "missing vowels",
+                    "groups": [
+                        {"name": f"Group {i}", "phrases": [f"phrase number {i}"]}
+                        for i in range(200)
+                    ],
+                }
+            ]
+        }
+    )
+    store = seen.SeenStore(tmp_path)
+    choices, keys = game.choose(pack, 1, store.get("thursdays"))
+    assert len(choices[0]) == len(keys) == game.MissingVowels.GROUPS
+    store.record("thursdays", keys)
+    later, _ = game.choose(pack, 2, store.get("thursdays"))
+    assert not set(later[0]) & set(choices[0])
+    # without a league, all of them are there to be played
+    assert sorted(game.choose(pack, 1, None)[0][0]) == list(range(200))
@@ -0,0 +1,111 @@
+import json
+
+import freezegun
+import pytest
+
+from lonelyconnect import game, packs, rooms, snapshots
+
+PACK = {
+    "parts": [
+        {
+            "type": "connections",
+            "questions": [
+                {
+                    "answer": f"Answer {i}",
+                    "explanation": f"Explanation {i}",
+                    "steps": [{"label": f"Hint {i}{j}"} for j in range(4)],
+                }
+                for i in range(10)
+            ],
+        },
+        {
+            "type": "missing vowels",
+            "groups": [
+                {"name": f"Group {i}", "phrases": [f"phrase {i}{j}" for j in "abc"]}
+                for i in range(3)
+            ],
+        },
+    ]
+}
+
+
+def roundtrip(room):
+    restored = rooms.Room(room.id)
+    # through JSON, like the snapshot file
+    snapshots.restore(restored, json.loads(json.dumps(snapshots.dump(room))))
+    return restored
+
+
+def assert_same(room, restored):
+    assert restored.game.stage() == room.game.stage()
+    assert restored.game.secrets() == room.game.secrets()
+    assert restored.game.actions() == room.game.actions()
+
+
+@freezegun.freeze_time()  # restored timers end at the same time
+def test_roundtrip_through_a_game():
+    room = rooms.Room("x")
+    room.execute("load", packs.PACKS.add(PACK), 42)
+    room.execute("name", "left", "THE LEFTS")
+    room.execute("pair", "ABCDEF", "right")
+    assert_same(room, roundtrip(room))
+    for key in ("next", "next", "start_left", "next"):
+        room.execute("action", key)
+        assert_same(room, roundtrip(room))
+    room.execute("buzz", "left")
+    room.execute("action", "award_primary")
+    # on to the missing vowels
+    while not isinstance(room.game.part, game.MissingVowels):
+        room.execute("action", room.game.actions()[0][0])
+        assert_same(room, roundtrip(room))
+    room.execute("action", "next")
+    room.execute("action", "next")
+    assert room.game.part.timer
+    restored = roundtrip(room)
+    assert_same(room, restored)
+    assert restored.users["left"].descriptive_name == "THE LEFTS"
+    assert restored.codes == {"ABCDEF": "right"}
+    # and it goes on the same way
+    for _ in range(5):
+        room.execute("action", "next")
+        restored.execute("action", "next")
+        assert_same(room, restored)
+
+
+def test_frozen_timer():
+    room = rooms.Room("x")
+    room.execute("load", packs.PACKS.add(PACK), 1)
+    for key in ("next", "next", "start_right"):
+        room.execute("action", key)
+    room.execute("buzz", "right")
+    room.game.part.task.timer._remaining = 12.5
+    timer = roundtrip(room).game.part.task.timer
+    assert timer.remaining == 12.5
+    assert timer.duration == 30
+
+
+def test_migrations(monkeypatch):
+    room = rooms.Room("x")
+    room.execute("score", "left", 2)
+    old = snapshots.dump(room)
+    old["schema"] = 0
+    old["points"] = old["game"].pop("points")
+
+    def from_0(snapshot):
+        snapshot["game"]["points"] = snapshot.pop("points")
+        return {**snapshot, "schema": 1}
+
+    monkeypatch.setitem(snapshots.MIGRATIONS, 0, from_0)
+    restored = rooms.Room("x")
+    snapshots.restore(restored, old)
+    assert restored.game.points["left"] == 2
+
+    with pytest.raises(ValueError):
+        snapshots.restore(restored, {**old, "schema": snapshots.SCHEMA + 1})
+
+
+def test_unloaded_game():
+    room = rooms.Room("x")
+    restored = roundtrip(room)
+    assert restored.game.is_done
+    assert restored.game.pack is None
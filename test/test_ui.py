@@ -1,9 +1,11 @@
+import asyncio
+
 import yaml
 
 import freezegun
 import uvicorn
 
-from lonelyconnect import game, entrypoint
+from lonelyconnect import broadcast, cache, game, entrypoint, packs, rooms, route_ui
 
 
 def test_ui_redirect(requests, admin_token, player_token):
@@ -30,6 +32,20 @@ def test_ui_admin(requests, admin_token, player_token):
     ).ok
 
 
+def test_ui_packs(requests, admin_token, monkeypatch):
+    monkeypatch.setattr(packs.PACKS, "names", dict(packs.PACKS.names))
+    auth = {"Authorization": f"Bearer {admin_token}"}
+    r = requests.get("/ui/admin", headers=auth)
+    assert "/ui/packs" in r.text
+    pack = packs.PACKS.add({"parts": []}, name="later.yml")
+    # the admin page is the same, the packs aren't
+    again = requests.get(
+        "/ui/admin", headers={**auth, "If-None-Match": r.headers["etag"]}
+    )
+    assert again.status_code == 304
+    assert f"/load/{pack}" in requests.get("/ui/packs", headers=auth).text
+
+
 def test_ui_buzzer(requests, admin_token, player_token):
     assert not requests.get(
         "/ui/buzzer", headers={"Authorization": f"Bearer {admin_token}"}
@@ -239,3 +255,109 @@ def test_the_rest(monkeypatch):
     # 100% coverage %)
     monkeypatch.setattr(uvicorn, "run", lambda *a, **k: 42)
     assert entrypoint() == 42
+
+
+def test_ui_stage_poll_fallback(requests, sample_game):
+    game.GAME = sample_game
+    assert "hx-sse" in requests.get("/ui/stage").text
+    r = requests.get("/ui/stage?poll=true")
+    assert "hx-sse" not in r.text
+    assert 'hx-trigger="every 1s"' in r.text
+
+
+def test_ui_stage_events(sample_game):
+    game.GAME = sample_game
+
+    class FakeRequest:
+        def __init__(self, connected_for):
+            self.connected_for = connected_for
+
+        async def is_disconnected(self):
+            self.connected_for -= 1
+            return self.connected_for < 0
+
+    async def collect():
+        events = []
+        async for message in route_ui.stage_events(FakeRequest(2), rooms.DEFAULT):
+            events.append(message)
+            game.GAME.points["left"] = 42
+            game.GAME.touch()
+            broadcast.CHANGES.notify()
+        return events
+
+    first, second = asyncio.run(collect())
+    assert first.startswith("event: stage\ndata: ")
+    assert "<html>" not in first
+    assert "42" in second
+
+
+def test_render_cache(requests, sample_game):
+    game.GAME = sample_game
+    hits, misses = cache.RENDERS.hits, cache.RENDERS.misses
+    first = requests.get("/ui/stage").text
+    assert requests.get("/ui/stage").text == first
+    assert (cache.RENDERS.hits, cache.RENDERS.misses) == (hits + 1, misses + 1)
+
+    game.GAME.points["left"] = 5
+    game.GAME.touch()
+    assert requests.get("/ui/stage").text != first
+    assert cache.RENDERS.misses == misses + 2
+
+
+def test_render_cache_is_shared_by_logins(
+    requests, admin_token, player_token, sample_game
+):
+    game.GAME = sample_game
+    code = requests.post(
+        "/pair/right", headers={"Authorization": f"Bearer {admin_token}"}
+    ).json()
+    other = requests.post(
+        "/login",
+        data={"grant_type": "password", "username": "nobody", "password": code},
+    ).json()["access_token"]
+    misses = cache.RENDERS.misses
+    first = requests.get(
+        "/ui/buzzer", headers={"Authorization": f"Bearer {player_token}"}
+    )
+    second = requests.get("/ui/buzzer", headers={"Authorization": f"Bearer {other}"})
+    assert cache.RENDERS.misses == misses + 1
+    assert player_token in first.text and other not in first.text
+    assert other in second.text and player_token not in second.text
+    assert route_ui.TOKEN not in first.text
+
+
+def test_render_cache_eviction():
+    renders = cache.RenderCache(size=2)
+    assert renders.get("a", lambda: "A") == "A"
+    assert renders.get("b", lambda: "B") == "B"
+    assert renders.get("a", lambda: "not called") == "A"
+    assert renders.get("c", lambda: "C") == "C"  # evicts b, the least recent
+    assert renders.get("b", lambda: "B again") == "B again"
+    assert renders.stats() == {"hits": 1, "misses": 4, "size": 2}
+
+
+def test_timers_count_down_in_the_browser(requests, admin_token, sample_game):
+    game.GAME = sample_game
+    auth = {"Authorization": f"Bearer {admin_token}"}
+    with freezegun.freeze_time() as t:
+        for key in ("next", "next", "start_left"):
+            assert requests.post(f"/action/{key}", headers=auth).ok
+        r = requests.get("/ui/stage")
+        assert 'data-remaining="30.0"' in r.text
+        t.tick(5)
+        # nothing to render again while the timer runs
+        again = requests.get("/ui/stage", headers={"If-None-Match": r.headers["etag"]})
+        assert again.status_code == 304
+        # but whoever comes later counts down from what's left by then
+        assert 'data-remaining="25.0"' in requests.get("/ui/stage").text
+        assert requests.get("/stage").json()["time_remaining"] == 25
+
+
+def test_ui_profile(requests, admin_token, player_token):
+    r = requests.get("/ui/admin", headers={"Authorization": f"Bearer {admin_token}"})
+    assert "/ui/profile" in r.text
+    assert not requests.get(
+        "/ui/profile", headers={"Authorization": f"Bearer {player_token}"}
+    ).ok
+    r = requests.get("/ui/profile", headers={"Authorization": f"Bearer {admin_token}"})
+    assert r.ok and "<ol>" in r.text